@@ -1,24 +1,40 @@
 import json
 import logging
-from typing import Dict, List, Union
-from datetime import datetime, timedelta
+import threading
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Union
+from datetime import datetime, timedelta, timezone
 
 import dataconf.exceptions
 from dateutil.relativedelta import relativedelta
 from dateutil import parser
 
-from keboola.component.base import ComponentBase
+from keboola.component.base import ComponentBase, sync_action
 from keboola.component.exceptions import UserException
 from keboola.component.interface import register_csv_dialect
+from keboola.component.sync_actions import MessageType, ValidationResult
 from keboola.utils.helpers import comma_separated_values_to_list
-from keboola.csvwriter import ElasticDictWriter
 
 from xero_python.accounting import RowType
 from xero_python.models import serialize_to_dict
 
 from configuration import Configuration
-from xero.client import XeroClient
-from xero.utility import XeroException
+from postprocessing import PERIOD_DELTA_COLUMNS, add_period_deltas
+from schema_registry import SchemaRegistry
+from sharding import get_shard, get_shard_tenant_ids
+from writer import FixedSchemaWriter
+from xero.client import XeroClient, PAGE_SIZE, PAGINATED_ACCOUNTING_OBJECTS
+from xero.key_engine import KEY_ALGORITHMS, SurrogateKeyEngine
+from xero.pipeline import ExtractionPipeline, create_parse_pool
+from xero.rate_limiter import CONCURRENT_CALLS_LIMIT, DAILY_CALLS_LIMIT, estimate_duration
+from xero.response_archive import ARCHIVE_FILE_SUFFIX, ARCHIVE_FILE_TAG, ResponseArchiveReader, \
+    ResponseArchiveWriter
+from xero.tracking import TrackingSelection, TRACKING_COLUMNS, TRACKING_MODE_ALL_OPTIONS, TRACKING_MODE_NONE, \
+    TRACKING_MODE_SELECTED_PAIRS, TRACKING_MODES, get_tracking_selections, parse_option_pairs
+from xero.table_definition_factory import TENANT_ID_COLUMN, TableDefinitionFactory
+from xero.utility import XeroException, TERMINAL_TYPE_MAPPING
+from xero.xero_parser import XeroParser
 from xero_python.accounting.models import report as XeroReport
 
 
@@ -36,14 +52,33 @@ KEY_PAYMENTS_ONLY = 'payments_only'
 KEY_GROUP_DESTINATION_OPTIONS = 'destination'
 KEY_LOAD_TYPE = 'load_type'
 
+RUN_MODE_EXTRACT = "extract"
+RUN_MODE_REPARSE = "reparse"
+RUN_MODES = [RUN_MODE_EXTRACT, RUN_MODE_REPARSE]
+
 KEY_STATE_OAUTH_TOKEN_DICT = "#oauth_token_dict"
 KEY_STATE_ENDPOINT_COLUMNS = "endpoint_columns"
+KEY_STATE_LAST_MODIFIED = "last_modified"
+KEY_STATE_TABLE_SCHEMAS = "table_schemas"
 
 # list of mandatory parameters => if some is missing,
 # component will fail with readable message on initialization.
 REQUIRED_PARAMETERS = [KEY_GROUP_REPORT_PARAMS, KEY_GROUP_DESTINATION_OPTIONS]
 
 
+class BalanceSheetRow(NamedTuple):
+    report_title: str
+    title: str
+    account_name: str
+    account_id: str
+    date: str
+    request_date: str
+    value: str
+
+
+BALANCE_SHEET_COLUMNS = list(BalanceSheetRow._fields)
+
+
 class Component(ComponentBase):
     def __init__(self, data_path_override: str = None):
         super().__init__(data_path_override=data_path_override, required_parameters=REQUIRED_PARAMETERS)
@@ -54,7 +89,11 @@ class Component(ComponentBase):
         self.tables = {}
         self._writer_cache = {}
         self.new_state = {}
-        self.columns = set()
+        self.schema_registry = SchemaRegistry()
+        self._last_modified_lock = threading.Lock()
+        # serializes writes of the state file, the rotated token is saved from fetching threads
+        self._state_lock = threading.Lock()
+        self._pending_last_modified: Union[datetime, None] = None
 
         register_csv_dialect()
 
@@ -64,12 +103,18 @@ class Component(ComponentBase):
         sync_options = self._configuration.sync_options
         destination = self._configuration.destination
 
-        columns = self.get_state_file().get("columns", self.columns)
-        self.columns = set(columns)
+        self.schema_registry = SchemaRegistry(self.get_state_file().get(KEY_STATE_TABLE_SCHEMAS))
+        self.new_state[KEY_STATE_LAST_MODIFIED] = self._get_shard_last_modified(
+            self.get_state_file().get(KEY_STATE_LAST_MODIFIED, {}))
 
         load_type = destination.load_type
         self.incremental_load = load_type == "incremental_load"
 
+        if self._configuration.run_mode == RUN_MODE_REPARSE:
+            self.reparse_reports()
+            self._save_reparse_state()
+            return
+
         self._init_client()
 
         available_tenant_ids = self._get_available_tenant_ids()
@@ -78,6 +123,7 @@ class Component(ComponentBase):
         batches = self.generate_batches(report_params, Configuration.as_dict(sync_options))
 
         self.download_reports(tenant_ids=tenant_ids_to_download, batches=batches)
+        self.download_accounting_objects(tenant_ids=tenant_ids_to_download)
 
         self.refresh_token_and_save_state()
 
@@ -92,12 +138,69 @@ class Component(ComponentBase):
         if not self._configuration.report_parameters.date:
             raise UserException("Date parameter is required")
 
+        if self._configuration.sync_options.surrogate_key_algorithm not in KEY_ALGORITHMS:
+            raise UserException(f"Invalid surrogate key algorithm, choose from {', '.join(KEY_ALGORITHMS)}.")
+
+        tracking_fan_out = self._configuration.tracking_fan_out
+        if tracking_fan_out.mode not in TRACKING_MODES:
+            raise UserException(f"Invalid tracking fan-out mode, choose from {', '.join(TRACKING_MODES)}.")
+        if tracking_fan_out.mode == TRACKING_MODE_SELECTED_PAIRS:
+            option_pairs = parse_option_pairs(tracking_fan_out.option_pairs)
+            if not option_pairs or not all(option_id1 for option_id1, _ in option_pairs):
+                raise UserException("Tracking fan-out option pairs must be set in the format option_id1:option_id2 "
+                                    "for the selected pairs mode.")
+
+        unsupported_objects = set(self._configuration.accounting_objects) - set(PAGINATED_ACCOUNTING_OBJECTS)
+        if unsupported_objects:
+            raise UserException(f"Unsupported accounting objects: {', '.join(sorted(unsupported_objects))}. "
+                                f"Supported objects are: {', '.join(PAGINATED_ACCOUNTING_OBJECTS)}")
+
+        if self._configuration.run_mode not in RUN_MODES:
+            raise UserException(f"Invalid run mode, choose from {', '.join(RUN_MODES)}.")
+        if self._configuration.run_mode == RUN_MODE_REPARSE and self._configuration.accounting_objects:
+            logging.warning("Accounting objects are not archived, they are skipped in the reparse run mode.")
+
+        if not 1 <= self._configuration.sync_options.max_workers <= CONCURRENT_CALLS_LIMIT:
+            raise UserException(f"Invalid number of concurrent requests, it must be between 1 and "
+                                f"{CONCURRENT_CALLS_LIMIT}.")
+        if self._configuration.sync_options.parse_processes < 0:
+            raise UserException("Invalid number of parsing processes, it must be 0 or a positive number.")
+
+        sharding = self._configuration.sharding
+        if sharding.shard_count < 1 or not 0 <= sharding.shard_index < sharding.shard_count:
+            raise UserException("Invalid sharding, shard count must be at least 1 and shard index "
+                                "must be between 0 and shard count - 1.")
+        # accounting object tables are shared by all shards, a full load of one shard would drop the others
+        if sharding.shard_count > 1 and self._configuration.accounting_objects \
+                and self._configuration.destination.load_type != "incremental_load":
+            raise UserException("Accounting objects of a sharded extraction must be loaded incrementally, "
+                                "please set the load type to incremental load.")
+
     def refresh_token_and_save_state(self) -> None:
         self._refresh_client_token()
-        self.new_state[KEY_STATE_OAUTH_TOKEN_DICT] = json.dumps(self.client.get_xero_oauth2_token_dict())
-        self.new_state["columns"] = list(self.columns)
+        self._save_state(self.client.get_xero_oauth2_token_dict())
+
+    def _save_state(self, oauth_token_dict: Dict) -> None:
+        with self._state_lock:
+            self.new_state[KEY_STATE_OAUTH_TOKEN_DICT] = json.dumps(oauth_token_dict)
+            self.new_state[KEY_STATE_TABLE_SCHEMAS] = self.schema_registry.to_dict()
+            self.write_state_file(self.new_state)
+
+    def _save_reparse_state(self) -> None:
+        # no API calls are made, the OAuth token and checkpoints of the previous run are kept
+        self.new_state = dict(self.get_state_file())
+        self.new_state[KEY_STATE_TABLE_SCHEMAS] = self.schema_registry.to_dict()
         self.write_state_file(self.new_state)
 
+    def _on_token_rotated(self, oauth_token_dict: Dict) -> None:
+        # the previous refresh token is no longer valid, persist the new one right away, merged into the incoming
+        # state only, checkpoints and schemas of this run are saved once all tables are written
+        logging.debug("OAuth token rotated, saving state")
+        with self._state_lock:
+            state = dict(self.get_state_file())
+            state[KEY_STATE_OAUTH_TOKEN_DICT] = json.dumps(oauth_token_dict)
+            self.write_state_file(state)
+
     def _refresh_client_token(self) -> None:
         try:
             self.client.force_refresh_token()
@@ -110,25 +213,304 @@ class Component(ComponentBase):
         logging.info(f"Fetching report data for tenant_ids: {tenant_ids}")
 
         for tenant_id in tenant_ids:
-            table_name = f"balance_sheet_{tenant_id}"
+            tracking_selections = self._get_tracking_selections(tenant_id)
+            jobs = self._get_report_jobs(tracking_selections, batches)
+
+            # reports are fetched in parallel, parsing stays in this thread as convert_api_response is not thread-safe
+            with ThreadPoolExecutor(max_workers=self._configuration.sync_options.max_workers) as executor:
+                reports = executor.map(lambda job: self._fetch_balance_sheet(tenant_id, *job), jobs)
+                responses = ((self._get_report_parameters(batch, tracking_selection), tracking_selection, report)
+                             for (batch, tracking_selection), report in zip(jobs, reports))
+                if self._configuration.sync_options.archive_responses:
+                    responses = self._archive_responses(tenant_id, responses)
+                self.write_balance_sheet_table(tenant_id, responses, with_tracking=bool(tracking_selections))
+
+    def reparse_reports(self) -> None:
+        """Rebuild the balance sheet tables from archived responses in the input files, without any API calls."""
+        archive_files = self.get_input_files_definitions(only_latest_files=False, tags=[ARCHIVE_FILE_TAG])
+        if not archive_files:
+            raise UserException(f"No archived responses found, please add the files tagged {ARCHIVE_FILE_TAG} "
+                                f"to the input mapping.")
+
+        archive_files = sorted(archive_files, key=lambda file_def: int(file_def.id or 0))
+        logging.info(f"Indexing archived responses from {len(archive_files)} files")
+        archive = ResponseArchiveReader([file_def.full_path for file_def in archive_files])
+
+        tenant_ids = comma_separated_values_to_list(self._configuration.tenant_ids) or archive.tenant_ids
+        sharding = self._configuration.sharding
+        tenant_ids = get_shard_tenant_ids(tenant_ids, sharding.shard_index, sharding.shard_count)
+        for tenant_id in tenant_ids:
+            response_count = archive.get_response_count(tenant_id)
+            if not response_count:
+                logging.warning(f"No archived responses found for tenant {tenant_id}")
+                continue
 
-            table_def = self.create_out_table_definition(table_name,
-                                                         columns=[],
-                                                         primary_key=["date", "account_id"],
-                                                         incremental=self.incremental_load)
+            logging.info(f"Parsing {response_count} archived responses of tenant {tenant_id}")
+            with_tracking = archive.has_tracking(tenant_id)
+            responses = ((response.parameters, response.tracking_selection or TrackingSelection(), response.response)
+                         if with_tracking else (response.parameters, None, response.response)
+                         for response in archive.iter_responses(tenant_id))
+            self.write_balance_sheet_table(tenant_id, responses, with_tracking=with_tracking)
+
+    def write_balance_sheet_table(self, tenant_id: str, responses: Iterable[tuple], with_tracking: bool) -> None:
+        """
+        Parse report responses of a tenant and write them to its balance sheet table.
+
+        Args:
+            tenant_id: ID of the tenant
+            responses: tuples of the request parameters, tracking selection and the report response
+            with_tracking: add the tracking columns, all responses must have a tracking selection
+
+        """
+        table_name = f"balance_sheet_{tenant_id}"
+
+        columns = BALANCE_SHEET_COLUMNS
+        primary_key = ["date", "account_id"]
+        if with_tracking:
+            columns = BALANCE_SHEET_COLUMNS + TRACKING_COLUMNS
+            primary_key = primary_key + ["tracking_option_id1", "tracking_option_id2"]
+
+        table_def = self.create_out_table_definition(table_name,
+                                                     columns=[],
+                                                     primary_key=primary_key,
+                                                     incremental=self.incremental_load)
+
+        fieldnames = columns
+        compute_period_deltas = self._configuration.sync_options.compute_period_deltas
+        if compute_period_deltas:
+            fieldnames = columns + PERIOD_DELTA_COLUMNS
+            # empty for the first period of an account, a zero previous value and values that do not parse
+            for column in PERIOD_DELTA_COLUMNS:
+                float_type = TERMINAL_TYPE_MAPPING['float']
+                table_def.table_metadata.add_column_data_type(column, float_type.type, nullable=True,
+                                                              length=float_type.length)
+
+        with FixedSchemaWriter(table_def.full_path, fieldnames) as wr:
+            tenant_rows = []
+            for parameters, tracking_selection, report in responses:
+                logging.debug(f"Processing report data: {report}")
+                parsed = self.parse_balance_sheet(report, parameters[KEY_DATE])
+                if tracking_selection:
+                    parsed = [row + tracking_selection for row in parsed]
+                if compute_period_deltas:
+                    tenant_rows.extend(parsed)
+                else:
+                    wr.writerows(parsed)
 
-            with ElasticDictWriter(table_def.full_path, []) as wr:
-                for batch in batches:
-                    report = self.client.get_balance_sheet_report(tenant_id=tenant_id, **batch)
-                    logging.debug(f"Processing report data: {report}")
+            if compute_period_deltas:
+                wr.writerows(add_period_deltas(tenant_rows, columns))
 
-                    parsed = self.parse_balance_sheet(report, batch["date"])
+        self.schema_registry.register_table(table_def, wr.fieldnames)
+        self.write_manifest(table_def)
 
-                    wr.writeheader()
-                    wr.writerows(parsed)
+    def _archive_responses(self, tenant_id: str, responses: Iterable[tuple]) -> Iterator[tuple]:
+        """Write the responses to the archive output file while passing them through."""
+        file_def = self.create_out_file_definition(f"balance_sheet_{tenant_id}{ARCHIVE_FILE_SUFFIX}",
+                                                   tags=[ARCHIVE_FILE_TAG], is_permanent=True)
+        with ResponseArchiveWriter(file_def.full_path) as archive:
+            for parameters, tracking_selection, report in responses:
+                archive.write(tenant_id, parameters, tracking_selection, report)
+                yield parameters, tracking_selection, report
+        self.write_manifest(file_def)
+
+    def download_accounting_objects(self, tenant_ids: List[str]) -> None:
+        sync_options = self._configuration.sync_options
+        # worker processes are started on the first parsed page and shared by all objects and tenants
+        with create_parse_pool(sync_options.parse_processes) if sync_options.parse_processes else nullcontext() \
+                as parse_pool:
+            for model_name in self._configuration.accounting_objects:
+                logging.info(f"Fetching {model_name} for tenant_ids: {tenant_ids}")
+                self.tables = TableDefinitionFactory(model_name, self).get_table_definitions()
+
+                for tenant_id in tenant_ids:
+                    if_modified_since = self._get_if_modified_since(tenant_id, model_name)
+                    self._pending_last_modified = None
+                    pipeline = ExtractionPipeline(
+                        fetch_page=lambda page: self._fetch_accounting_object_page(model_name, tenant_id, page,
+                                                                                   if_modified_since),
+                        write_rows=lambda table_name, columns, rows: self._write_accounting_object_rows(
+                            tenant_id, table_name, columns, rows),
+                        page_size=PAGE_SIZE,
+                        fetch_workers=sync_options.max_workers,
+                        parser=XeroParser(SurrogateKeyEngine(sync_options.surrogate_key_algorithm)),
+                        parse_pool=parse_pool,
+                        parse_window=2 * sync_options.parse_processes)
+                    object_count = pipeline.run()
+                    logging.info(f"Fetched {object_count} {model_name} of tenant {tenant_id}")
+                    self._commit_last_modified(tenant_id, model_name)
+
+                self._close_accounting_object_writers()
+
+    def _get_if_modified_since(self, tenant_id: str, model_name: str) -> Union[datetime, None]:
+        if not self.incremental_load or not self.client.supports_if_modified_since(model_name):
+            return None
+        last_modified = self.new_state[KEY_STATE_LAST_MODIFIED].get(tenant_id, {}).get(model_name)
+        if last_modified:
+            logging.info(f"Fetching {model_name} of tenant {tenant_id} modified since {last_modified}")
+            return parser.isoparse(last_modified)
+        return None
+
+    def _fetch_accounting_object_page(self, model_name: str, tenant_id: str, page: int,
+                                      if_modified_since: datetime = None) -> list:
+        kwargs = {"if_modified_since": if_modified_since} if if_modified_since else {}
+        try:
+            objects = self.client.get_accounting_object_page(model_name, tenant_id, page, **kwargs)
+        except XeroException as xero_exc:
+            raise UserException(xero_exc) from xero_exc
+
+        updated_dates = [self._as_utc(obj.updated_date_utc) for obj in objects
+                         if getattr(obj, "updated_date_utc", None)]
+        if updated_dates:
+            with self._last_modified_lock:
+                if self._pending_last_modified:
+                    updated_dates.append(self._pending_last_modified)
+                self._pending_last_modified = max(updated_dates)
+        return objects
+
+    def _commit_last_modified(self, tenant_id: str, model_name: str) -> None:
+        """Store the high-water mark once all objects of the tenant are written."""
+        if self._pending_last_modified:
+            tenant_marks = self.new_state[KEY_STATE_LAST_MODIFIED].setdefault(tenant_id, {})
+            tenant_marks[model_name] = self._pending_last_modified.isoformat()
 
-            self.columns.update(wr.fieldnames)
+    @staticmethod
+    def _as_utc(value: datetime) -> datetime:
+        if value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc)
+
+    def _write_accounting_object_rows(self, tenant_id: str, table_name: str, columns: List[str],
+                                      rows: List[tuple]) -> None:
+        writer = self._writer_cache.get(table_name)
+        if not writer:
+            if table_name not in self.tables:
+                self.tables[table_name] = self.create_out_table_definition(f"{table_name}.csv", columns=[])
+            table_def = self.tables[table_name]
+            table_def.incremental = self.incremental_load
+            # the columns are listed in the manifest
+            writer = FixedSchemaWriter(table_def.full_path,
+                                       self.schema_registry.get_fieldnames(table_name, table_def.columns),
+                                       write_header=False)
+            self._writer_cache[table_name] = writer
+        writer.write_columns([TENANT_ID_COLUMN] + columns, [(tenant_id,) + row for row in rows])
+
+    def _close_accounting_object_writers(self) -> None:
+        for table_name, writer in self._writer_cache.items():
+            writer.close()
+            table_def = self.tables[table_name]
+            table_def.columns = writer.fieldnames
+            self.schema_registry.register_table(table_def, writer.fieldnames)
             self.write_manifest(table_def)
+        self._writer_cache = {}
+
+    @staticmethod
+    def _get_report_jobs(tracking_selections: List[TrackingSelection], batches: list) -> list:
+        return [(batch, selection) for selection in tracking_selections or [None] for batch in batches]
+
+    @staticmethod
+    def _get_report_parameters(batch: dict, tracking_selection: TrackingSelection = None) -> dict:
+        if tracking_selection:
+            return batch | {KEY_TRACKING_OPTION_ID1: tracking_selection.tracking_option_id1,
+                            KEY_TRACKING_OPTION_ID2: tracking_selection.tracking_option_id2}
+        return batch
+
+    def _fetch_balance_sheet(self, tenant_id: str, batch: dict, tracking_selection: TrackingSelection = None):
+        try:
+            return self.client.get_balance_sheet_report(tenant_id=tenant_id,
+                                                        **self._get_report_parameters(batch, tracking_selection))
+        except XeroException as xero_exc:
+            raise UserException(xero_exc) from xero_exc
+
+    def _get_tracking_selections(self, tenant_id: str) -> List[TrackingSelection]:
+        tracking_fan_out = self._configuration.tracking_fan_out
+        if tracking_fan_out.mode == TRACKING_MODE_NONE:
+            return []
+
+        try:
+            tracking_categories = self.client.get_tracking_categories(tenant_id)
+            selections = get_tracking_selections(tracking_categories, tracking_fan_out.mode,
+                                                 parse_option_pairs(tracking_fan_out.option_pairs))
+        except XeroException as xero_exc:
+            raise UserException(f"Failed to resolve tracking options of tenant {tenant_id}: {xero_exc}") \
+                from xero_exc
+
+        if not selections:
+            logging.warning(f"No tracking options found for tenant {tenant_id}, downloading unfiltered report.")
+            selections = [TrackingSelection()]
+        logging.info(f"Fetching balance sheet of tenant {tenant_id} for {len(selections)} tracking selections")
+        return selections
+
+    @sync_action('estimate_call_plan')
+    def estimate_call_plan(self) -> ValidationResult:
+        """
+        Report the number of API calls, expected wall time and daily quota usage per tenant
+        without fetching any report data.
+
+        The state of a sync action is not saved, so the OAuth token is never refreshed here, a rotated refresh
+        token would be lost. If the access token has expired, the plan is computed from the configured tenant IDs
+        without calling the API.
+        """
+        self._init_configuration()
+        report_params = Configuration.as_dict(self._configuration.report_parameters)
+        sync_options = self._configuration.sync_options
+        batches = self.generate_batches(report_params, Configuration.as_dict(sync_options))
+
+        notes = []
+        tracking_mode = self._configuration.tracking_fan_out.mode
+        online = self._init_client_without_refresh()
+        if online:
+            tenant_ids = self._get_tenants_to_download(self._get_available_tenant_ids())
+        else:
+            configured_tenant_ids = comma_separated_values_to_list(self._configuration.tenant_ids)
+            if not configured_tenant_ids:
+                raise UserException("The access token has expired, please fill in the Tenant IDs to estimate "
+                                    "the API calls without connecting to Xero, or run the component first.")
+            tenant_ids = self._get_tenants_to_download(configured_tenant_ids)
+            notes.append("The access token has expired, the plan is computed without connecting to Xero.")
+            if tracking_mode == TRACKING_MODE_ALL_OPTIONS:
+                notes.append("Tracking options could not be discovered, each tenant is counted with one option.")
+
+        lines = ["| Tenant ID | API calls | Estimated time | Daily quota used |",
+                 "|---|---|---|---|"]
+        total_calls, total_duration, message_type = 0, 0.0, MessageType.INFO
+        for tenant_id in tenant_ids:
+            planning_calls = 0 if tracking_mode == TRACKING_MODE_NONE else 1
+            tracking_selections = self._get_tracking_selections(tenant_id) if online \
+                else self._get_offline_tracking_selections()
+            calls = planning_calls + len(self._get_report_jobs(tracking_selections, batches))
+            # accounting objects need at least one page call each
+            calls += len(self._configuration.accounting_objects)
+            duration = estimate_duration(calls, sync_options.max_workers)
+            quota_share = calls / DAILY_CALLS_LIMIT
+            if quota_share > 1:
+                message_type = MessageType.WARNING
+
+            lines.append(f"| {tenant_id} | {calls} | {timedelta(seconds=round(duration))} | {quota_share:.1%} |")
+            total_calls += calls
+            total_duration += duration
+
+        lines.append(f"| **Total** | {total_calls} | {timedelta(seconds=round(total_duration))} | |")
+        return ValidationResult("\n\n".join(["\n".join(lines)] + notes), message_type)
+
+    def _get_offline_tracking_selections(self) -> List[TrackingSelection]:
+        """Placeholder selections with the expected count, the tracking categories are not discovered."""
+        tracking_fan_out = self._configuration.tracking_fan_out
+        if tracking_fan_out.mode == TRACKING_MODE_NONE:
+            return []
+        if tracking_fan_out.mode == TRACKING_MODE_SELECTED_PAIRS:
+            return [TrackingSelection()] * max(1, len(parse_option_pairs(tracking_fan_out.option_pairs)))
+        return [TrackingSelection()]
+
+    def _init_client_without_refresh(self) -> bool:
+        """Authorize the client with the latest token without refreshing it, return False if the token expired."""
+        oauth_credentials = self.configuration.oauth_credentials
+        state_authorization_params = self.get_state_file().get(KEY_STATE_OAUTH_TOKEN_DICT)
+        if self._state_contains_authorization_parameters(state_authorization_params):
+            oauth_credentials.data = self._load_state_oauth(state_authorization_params)
+        if isinstance(oauth_credentials.data.get("scope"), str):
+            oauth_credentials.data["scope"] = oauth_credentials.data["scope"].split(" ")
+        self.client = XeroClient(oauth_credentials, token_refresh_enabled=False)
+        return not self.client.token_expires_soon()
 
     def _init_client(self) -> None:
         logging.info("Authorizing Client")
@@ -148,9 +530,9 @@ class Component(ComponentBase):
     def _init_client_from_state(self, state_authorization_params: Union[str, Dict]) -> None:
         oauth_credentials = self.configuration.oauth_credentials
         oauth_credentials.data = self._load_state_oauth(state_authorization_params)
-        self.client = XeroClient(oauth_credentials)
+        self.client = XeroClient(oauth_credentials, on_token_rotated=self._on_token_rotated)
         try:
-            self.refresh_token_and_save_state()
+            self._refresh_client_token()
             self.client.get_available_tenant_ids()
         except (UserException, XeroException):
             logging.warning("Authorizing Client from state failed, trying from oauth")
@@ -169,9 +551,9 @@ class Component(ComponentBase):
         oauth_credentials = self.configuration.oauth_credentials
         if isinstance(oauth_credentials.data.get("scope"), str):
             oauth_credentials.data["scope"] = oauth_credentials.data["scope"].split(" ")
-        self.client = XeroClient(oauth_credentials)
+        self.client = XeroClient(oauth_credentials, on_token_rotated=self._on_token_rotated)
         try:
-            self.refresh_token_and_save_state()
+            self._refresh_client_token()
             self.client.get_available_tenant_ids()
         except (UserException, XeroException) as xero_exception:
             raise UserException(xero_exception) from xero_exception
@@ -198,8 +580,23 @@ class Component(ComponentBase):
             logging.info(f'Tenant IDs not specified, using all available: {available_tenant_ids}.')
 
         self._validate_tenants_to_download(tenant_ids_to_download, available_tenant_ids)
+
+        sharding = self._configuration.sharding
+        if sharding.shard_count > 1:
+            tenant_ids_to_download = get_shard_tenant_ids(tenant_ids_to_download, sharding.shard_index,
+                                                          sharding.shard_count)
+            logging.info(f"Shard {sharding.shard_index + 1}/{sharding.shard_count} "
+                         f"downloads tenants: {tenant_ids_to_download}")
         return tenant_ids_to_download
 
+    def _get_shard_last_modified(self, last_modified: Dict[str, Dict]) -> Dict[str, Dict]:
+        """Drop checkpoints of tenants that belong to other shards, e.g. after the shard count has changed."""
+        sharding = self._configuration.sharding
+        if sharding.shard_count == 1:
+            return last_modified
+        return {tenant_id: marks for tenant_id, marks in last_modified.items()
+                if get_shard(tenant_id, sharding.shard_count) == sharding.shard_index}
+
     @staticmethod
     def _validate_tenants_to_download(tenant_ids_to_download: List[str], available_tenant_ids: List[str]) -> None:
         unavailable_tenants = set(tenant_ids_to_download) - set(available_tenant_ids)
@@ -208,8 +605,9 @@ class Component(ComponentBase):
             raise UserException(f"Some tenants to be downloaded (IDs: {unavailable_tenants_str})"
                                 f" are not accessible, please, check if you granted sufficient credentials.")
 
-    def parse_balance_sheet(self, data: dict, date: str) -> list:
+    def parse_balance_sheet(self, data: dict, date: str) -> List[BalanceSheetRow]:
         report = serialize_to_dict(self.convert_api_response(data))
+        report_title = report.report_title
         results = []
 
         is_first_row = True
@@ -237,15 +635,8 @@ class Component(ComponentBase):
                             if cell.attributes:
                                 account_id = cell.attributes[0].value
 
-                            results.append({
-                                "report_title": report.report_title,
-                                "title": title,
-                                "account_name": account_name,
-                                "account_id": account_id,
-                                "date": date,
-                                "request_date": request_date,
-                                "value": value
-                            })
+                            results.append(BalanceSheetRow(report_title, title, account_name, account_id,
+                                                           date, request_date, value))
         return results
 
     @staticmethod
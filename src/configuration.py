@@ -1,6 +1,6 @@
 import dataclasses
 import json
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from typing import List
 
 import dataconf
@@ -60,9 +60,26 @@ class ReportParameters(ConfigurationBase):
     payments_only: bool = False
 
 
+@dataclass
+class TrackingFanOut(ConfigurationBase):
+    mode: str = "none"
+    option_pairs: str = ""
+
+
 @dataclass
 class SyncOptions(ConfigurationBase):
     previous_periods: int = 0
+    max_workers: int = 5
+    surrogate_key_algorithm: str = "blake2b"
+    compute_period_deltas: bool = False
+    archive_responses: bool = False
+    parse_processes: int = 0
+
+
+@dataclass
+class Sharding(ConfigurationBase):
+    shard_index: int = 0
+    shard_count: int = 1
 
 
 @dataclass
@@ -76,3 +93,7 @@ class Configuration(ConfigurationBase):
     sync_options: SyncOptions
     destination: Destination
     tenant_ids: str
+    tracking_fan_out: TrackingFanOut = field(default_factory=TrackingFanOut)
+    accounting_objects: List[str] = field(default_factory=list)
+    sharding: Sharding = field(default_factory=Sharding)
+    run_mode: str = "extract"
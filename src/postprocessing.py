@@ -0,0 +1,93 @@
+from typing import List, Sequence
+
+import numpy as np
+
+PERIOD_DELTA_COLUMNS = ["value_numeric", "value_change", "value_change_pct"]
+
+# output precision, matches the NUMERIC(38,8) column type
+DECIMAL_PLACES = 8
+
+KEY_VALUE = "value"
+KEY_DATE = "date"
+KEY_ACCOUNT_ID = "account_id"
+ACCOUNT_FALLBACK_KEY_COLUMNS = ["title", "account_name"]
+TRACKING_KEY_COLUMNS = ["tracking_option_id1", "tracking_option_id2"]
+
+
+def add_period_deltas(rows: List[Sequence], fieldnames: List[str]) -> List[tuple]:
+    """
+    Append the numeric value, period-over-period change and percentage change to balance sheet rows.
+
+    Rows are grouped by account (and tracking options if present) and ordered by date, the change is computed
+    against the previous available date of the same account. Rows without an account ID (e.g. totals) are
+    grouped by section title and account name. Values that cannot be compared are left empty.
+
+    Args:
+        rows: rows ordered as fieldnames
+        fieldnames: names of the row columns
+
+    Returns: rows extended with the PERIOD_DELTA_COLUMNS values
+
+    """
+    if not rows:
+        return []
+
+    columns = list(zip(*rows))
+    values = _parse_numbers(np.array(columns[fieldnames.index(KEY_VALUE)], dtype=str))
+    dates = np.array(columns[fieldnames.index(KEY_DATE)], dtype=str)
+    keys = _build_group_keys(columns, fieldnames)
+
+    order = np.lexsort((dates, keys))
+    sorted_values = values[order]
+    sorted_keys = keys[order]
+
+    previous = np.full(len(rows), np.nan)
+    same_group = sorted_keys[1:] == sorted_keys[:-1]
+    previous[1:] = np.where(same_group, sorted_values[:-1], np.nan)
+
+    change = sorted_values - previous
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change_pct = np.where(previous != 0, change / np.abs(previous) * 100, np.nan)
+
+    derived_columns = []
+    for sorted_column in (sorted_values, change, change_pct):
+        column = np.empty(len(rows))
+        column[order] = sorted_column
+        derived_columns.append(_to_csv_values(column))
+
+    return [tuple(row) + derived for row, derived in zip(rows, zip(*derived_columns))]
+
+
+def _parse_numbers(values: np.ndarray) -> np.ndarray:
+    values = np.char.strip(np.char.replace(values, ",", ""))
+    values = np.where(values == "", "nan", values)
+    try:
+        return values.astype(np.float64)
+    except ValueError:
+        return np.array([_parse_number(value) for value in values], dtype=np.float64)
+
+
+def _parse_number(value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        return np.nan
+
+
+def _build_group_keys(columns: List[tuple], fieldnames: List[str]) -> np.ndarray:
+    account_ids = np.array(columns[fieldnames.index(KEY_ACCOUNT_ID)], dtype=object)
+    fallback_keys = np.array(["\x1f".join(values) for values in
+                              zip(*(columns[fieldnames.index(column)] for column in ACCOUNT_FALLBACK_KEY_COLUMNS))],
+                             dtype=object)
+    keys = np.where(account_ids != "", account_ids, fallback_keys)
+
+    for column in TRACKING_KEY_COLUMNS:
+        if column in fieldnames:
+            keys = keys + "\x1e" + np.array(columns[fieldnames.index(column)], dtype=object)
+    return keys.astype(str)
+
+
+def _to_csv_values(column: np.ndarray) -> list:
+    rounded = np.round(column, DECIMAL_PLACES).astype(object)
+    rounded[np.isnan(column)] = ""
+    return rounded.tolist()
@@ -0,0 +1,70 @@
+import copy
+from typing import Dict, List
+
+from keboola.component.dao import KBCMetadataKeys, SupportedDataTypes, TableDefinition
+
+KEY_COLUMNS = "columns"
+KEY_TYPES = "types"
+KEY_TYPE = "type"
+KEY_LENGTH = "length"
+KEY_NULLABLE = "nullable"
+
+
+class SchemaRegistry:
+    """
+    Column names and types of every output table, persisted in the component state between runs.
+
+    Writers are seeded with all columns seen in previous runs, so the output header is stable and the writer
+    does not have to expand the file for known columns. Types are recorded once and added to every manifest.
+    """
+
+    def __init__(self, schemas: Dict[str, Dict] = None) -> None:
+        self._schemas: Dict[str, Dict] = copy.deepcopy(schemas) if schemas else {}
+
+    def to_dict(self) -> Dict[str, Dict]:
+        return copy.deepcopy(self._schemas)
+
+    def get_columns(self, table_name: str) -> List[str]:
+        return list(self._schemas.get(table_name, {}).get(KEY_COLUMNS, []))
+
+    def get_fieldnames(self, table_name: str, columns: List[str]) -> List[str]:
+        """Return `columns` followed by the other columns known for the table."""
+        fieldnames = list(columns)
+        known_columns = set(fieldnames)
+        fieldnames.extend(column for column in self.get_columns(table_name) if column not in known_columns)
+        return fieldnames
+
+    def register_table(self, table_def: TableDefinition, columns: List[str]) -> None:
+        """
+        Record the written columns and their types, add the column types to the table definition.
+        Types already present in the table definition metadata take precedence,
+        columns without any known type are recorded as nullable strings.
+        Types recorded by earlier versions without nullability are treated as nullable.
+        """
+        table_name = table_def.name.removesuffix('.csv')
+        schema = self._schemas.setdefault(table_name, {KEY_COLUMNS: [], KEY_TYPES: {}})
+
+        column_types = schema[KEY_TYPES]
+        column_types.update(self._get_column_types(table_def))
+        for column in columns:
+            if column not in schema[KEY_COLUMNS]:
+                schema[KEY_COLUMNS].append(column)
+            column_types.setdefault(column, {KEY_TYPE: SupportedDataTypes.STRING.value, KEY_LENGTH: None,
+                                             KEY_NULLABLE: True})
+
+        for column in columns:
+            column_type = column_types[column]
+            table_def.table_metadata.add_column_data_type(column=column, data_type=column_type[KEY_TYPE],
+                                                          nullable=column_type.get(KEY_NULLABLE, True),
+                                                          length=column_type[KEY_LENGTH])
+
+    @staticmethod
+    def _get_column_types(table_def: TableDefinition) -> Dict[str, Dict]:
+        column_types = {}
+        for column, metadata in table_def.table_metadata.column_metadata.items():
+            base_type = metadata.get(KBCMetadataKeys.base_data_type.value)
+            if base_type:
+                column_types[column] = {KEY_TYPE: base_type,
+                                        KEY_LENGTH: metadata.get(KBCMetadataKeys.data_type_length.value),
+                                        KEY_NULLABLE: metadata.get(KBCMetadataKeys.data_type_nullable.value, True)}
+        return column_types
@@ -0,0 +1,18 @@
+import hashlib
+from typing import List
+
+
+def get_shard(tenant_id: str, shard_count: int) -> int:
+    """
+    Return the index of the shard the tenant belongs to.
+
+    The shard is derived from the SHA-256 hash of the tenant ID, so it is the same in every job and run
+    regardless of the order or number of tenants, and only changes when the shard count changes.
+    """
+    digest = hashlib.sha256(tenant_id.encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') % shard_count
+
+
+def get_shard_tenant_ids(tenant_ids: List[str], shard_index: int, shard_count: int) -> List[str]:
+    """Return tenants of the shard, keeping their original order."""
+    return [tenant_id for tenant_id in tenant_ids if get_shard(tenant_id, shard_count) == shard_index]
@@ -0,0 +1,110 @@
+import csv
+import operator
+import os
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from keboola.csvwriter import ElasticDictWriter
+
+
+class FixedSchemaWriter:
+    """
+    CSV writer for rows with a schema known up front.
+
+    Rows are plain sequences ordered as `fieldnames` and are written in bulk with `csv.writer.writerows`,
+    so there is no per-row header check and no dict allocation. If a dict row containing columns outside
+    the preset header arrives, the already written data is handed over to an `ElasticDictWriter` and the
+    rest of the output is written through it.
+
+    The result file contains a header unless `write_header` is False, e.g. for tables with columns in the manifest.
+    """
+
+    def __init__(self, file_path: str, fieldnames: Sequence[str], buffering: int = 1024 * 1024,
+                 write_header: bool = True):
+        self.result_path = file_path
+        self.fieldnames: List[str] = list(fieldnames)
+        self._buffering = buffering
+        self._write_header = write_header
+
+        self._out_file = open(file_path, 'wt', newline='', buffering=buffering, encoding='utf-8')
+        # same line endings as ElasticDictWriter output
+        self._writer = csv.writer(self._out_file, lineterminator='\n')
+        if write_header:
+            self._writer.writerow(self.fieldnames)
+        self._elastic_writer: Optional[ElasticDictWriter] = None
+
+    @property
+    def is_elastic(self) -> bool:
+        return self._elastic_writer is not None
+
+    def writerows(self, rows: Iterable[Sequence]) -> None:
+        """Write rows ordered as the preset header."""
+        if self._elastic_writer:
+            fieldnames = self._fixed_fieldnames
+            self._elastic_writer.writerows(dict(zip(fieldnames, row)) for row in rows)
+        else:
+            self._writer.writerows(rows)
+
+    def writerow(self, row: Sequence) -> None:
+        self.writerows((row,))
+
+    def write_columns(self, columns: Sequence[str], rows: Iterable[Sequence]) -> None:
+        """
+        Write rows ordered as `columns`, they are reordered to the header and written in bulk.
+        Only if `columns` contain a column outside the header, the rows are written as dicts.
+        """
+        column_positions = {column: position for position, column in enumerate(columns)}
+        if self._elastic_writer or not column_positions.keys() <= set(self.fieldnames):
+            self.write_dicts(dict(zip(columns, row)) for row in rows)
+        elif list(columns) == self.fieldnames:
+            self._writer.writerows(rows)
+        else:
+            # columns missing in the rows point to an empty value appended to each row
+            missing_position = len(columns)
+            positions = [column_positions.get(column, missing_position) for column in self.fieldnames]
+            get_values = operator.itemgetter(*positions) if len(positions) > 1 \
+                else lambda row: (row[positions[0]],)
+            if missing_position in positions:
+                self._writer.writerows(get_values((*row, '')) for row in rows)
+            else:
+                self._writer.writerows(get_values(row) for row in rows)
+
+    def write_dicts(self, rows: Iterable[Dict]) -> None:
+        """
+        Write dict rows. Rows within the preset header are converted to sequences,
+        the first row with an unknown column switches the writer to the elastic mode.
+        """
+        known_columns = set(self.fieldnames)
+        for row in rows:
+            if self._elastic_writer:
+                self._elastic_writer.writerow(row)
+            elif known_columns.issuperset(row):
+                self._writer.writerow([row.get(column, '') for column in self.fieldnames])
+            else:
+                self._switch_to_elastic_writer()
+                self._elastic_writer.writerow(row)
+
+    def _switch_to_elastic_writer(self) -> None:
+        self._out_file.close()
+        self._fixed_fieldnames = list(self.fieldnames)
+        partial_path = f'{self.result_path}.partial'
+        os.replace(self.result_path, partial_path)
+
+        self._elastic_writer = ElasticDictWriter(self.result_path, self.fieldnames, buffering=self._buffering)
+        if self._write_header:
+            self._elastic_writer.writeheader()
+        with open(partial_path, 'rt', newline='', encoding='utf-8') as partial_file:
+            partial_fieldnames = None if self._write_header else self._fixed_fieldnames
+            self._elastic_writer.writerows(csv.DictReader(partial_file, fieldnames=partial_fieldnames))
+        os.remove(partial_path)
+
+    def close(self) -> None:
+        if self._elastic_writer:
+            self._elastic_writer.close()
+        else:
+            self._out_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -1,6 +1,7 @@
+import inspect
 import logging
 from dataclasses import dataclass
-from typing import Dict, Iterable, List
+from typing import Callable, Dict, Iterable, List
 
 from keboola.component.dao import OauthCredentials, TableDefinition
 
@@ -11,10 +12,21 @@ from xero_python.api_client.configuration import Configuration
 from xero_python.api_client.oauth2 import OAuth2Token
 from xero_python.api_client.serializer import serialize
 
-from xero_python.exceptions.http_status_exceptions import OAuth2InvalidGrantError, HTTPStatusException
+from xero_python.exceptions.http_status_exceptions import OAuth2InvalidGrantError, HTTPStatusException, \
+    RateLimitException
 
+from .rate_limiter import RateLimiter, MINUTE
+from .token_manager import OAuthTokenManager
 # Always import utility to monkey patch BaseModel
-from .utility import XeroException, EnhancedBaseModel
+from .utility import XeroException, EnhancedBaseModel, get_accounting_model
+
+RATE_LIMIT_MAX_RETRIES = 5
+
+# Accounting API endpoints returning up to PAGE_SIZE objects per page
+PAGINATED_ACCOUNTING_OBJECTS = ['BankTransactions', 'Contacts', 'CreditNotes', 'Invoices', 'LinkedTransactions',
+                                'ManualJournals', 'Overpayments', 'Payments', 'Prepayments', 'PurchaseOrders',
+                                'Quotes']
+PAGE_SIZE = 100
 
 
 @dataclass
@@ -24,27 +36,36 @@ class Table:
 
 
 class XeroClient:
-    def __init__(self, oauth_credentials: OauthCredentials) -> None:
-        self._oauth_token_dict = oauth_credentials.data
+    def __init__(self, oauth_credentials: OauthCredentials,
+                 on_token_rotated: Callable[[Dict], None] = None, token_refresh_enabled: bool = True) -> None:
+        """
+        Args:
+            oauth_credentials: OAuth credentials with the current token
+            on_token_rotated: called with every refreshed token
+            token_refresh_enabled: if False, the token is never refreshed and calls fail once it expires soon,
+                                   for runs that cannot persist the rotated refresh token (e.g. sync actions)
+        """
+        self._token_refresh_enabled = token_refresh_enabled
+        self._token_manager = OAuthTokenManager(oauth_credentials.data, on_token_rotated=on_token_rotated)
         oauth2_token_obj = OAuth2Token(client_id=oauth_credentials.appKey,
                                        client_secret=oauth_credentials.appSecret)
-        oauth2_token_obj.update_token(**self._oauth_token_dict)
+        oauth2_token_obj.update_token(**oauth_credentials.data)
         self._api_client = ApiClient(Configuration(oauth2_token=oauth2_token_obj),
-                                     oauth2_token_getter=self.get_xero_oauth2_token_dict,
-                                     oauth2_token_saver=self._set_xero_oauth2_token_dict)
+                                     oauth2_token_getter=self._token_manager.get_token,
+                                     oauth2_token_saver=self._token_manager.save_token)
 
+        self._rate_limiter = RateLimiter()
         self._available_tenant_ids = None
+        self._tracking_categories: Dict[str, List[EnhancedBaseModel]] = {}
 
     def get_xero_oauth2_token_dict(self) -> Dict:
-        return self._oauth_token_dict
-
-    def _set_xero_oauth2_token_dict(self, new_token: Dict) -> None:
-        self._oauth_token_dict = new_token
+        return self._token_manager.get_token()
 
     def refresh_available_tenant_ids(self) -> None:
         identity_api = IdentityApi(self._api_client)
         available_tenants = []
         try:
+            self._ensure_fresh_token()
             for connection in identity_api.get_connections():
                 tenant = serialize(connection)
                 available_tenants.append(tenant.get("tenantId"))
@@ -54,7 +75,7 @@ class XeroClient:
 
     def force_refresh_token(self):
         try:
-            self._api_client.refresh_oauth2_token()
+            self._token_manager.force_refresh(self._api_client.refresh_oauth2_token)
         except HTTPStatusException as http_error:
             raise XeroException(
                 "Failed to authenticate the client, please reauthorize the component") from http_error
@@ -68,4 +89,61 @@ class XeroClient:
         if kwargs:
             logging.info(f"Getting balance sheet report with parameters: {kwargs}")
         accounting_api = AccountingApi(self._api_client)
-        return accounting_api.get_report_balance_sheet(tenant_id, **kwargs).to_list()
+        return self._call_rate_limited(tenant_id, accounting_api.get_report_balance_sheet, **kwargs).to_list()
+
+    def get_tracking_categories(self, tenant_id: str) -> List[EnhancedBaseModel]:
+        if tenant_id not in self._tracking_categories:
+            logging.info(f"Getting tracking categories of tenant {tenant_id}")
+            accounting_api = AccountingApi(self._api_client)
+            self._tracking_categories[tenant_id] = self._call_rate_limited(
+                tenant_id, accounting_api.get_tracking_categories).to_list()
+        return self._tracking_categories[tenant_id]
+
+    def get_accounting_object_page(self, model_name: str, tenant_id: str, page: int,
+                                   **kwargs) -> List[EnhancedBaseModel]:
+        if model_name not in PAGINATED_ACCOUNTING_OBJECTS:
+            raise XeroException(f"Accounting object {model_name} is not supported.")
+        logging.debug(f"Getting page {page} of {model_name} for tenant {tenant_id}")
+        accounting_api = AccountingApi(self._api_client)
+        api_method = getattr(accounting_api, get_accounting_model(model_name).get_download_method_name())
+        return self._call_rate_limited(tenant_id, api_method, page=page, **kwargs).to_list() or []
+
+    @staticmethod
+    def supports_if_modified_since(model_name: str) -> bool:
+        api_method = getattr(AccountingApi, get_accounting_model(model_name).get_download_method_name())
+        return "if_modified_since" in inspect.signature(api_method).parameters
+
+    def _call_rate_limited(self, tenant_id: str, api_method: Callable, **kwargs):
+        for attempt in range(1, RATE_LIMIT_MAX_RETRIES + 1):
+            self._ensure_fresh_token()
+            with self._rate_limiter.limit(tenant_id):
+                try:
+                    return api_method(tenant_id, **kwargs)
+                except RateLimitException as rate_limit_exc:
+                    if attempt == RATE_LIMIT_MAX_RETRIES or rate_limit_exc.rate_limit == "day":
+                        raise XeroException(f"API rate limit exceeded: {rate_limit_exc.error_message}") \
+                            from rate_limit_exc
+                    retry_after = self._get_retry_after(rate_limit_exc)
+                    logging.warning(f"{rate_limit_exc.error_message}, retrying in {retry_after} seconds")
+                    self._rate_limiter.block(tenant_id, retry_after)
+
+    def token_expires_soon(self) -> bool:
+        return self._token_manager.expires_soon()
+
+    def _ensure_fresh_token(self) -> None:
+        if not self._token_refresh_enabled:
+            if self._token_manager.expires_soon():
+                raise XeroException("The access token has expired and cannot be refreshed in this run")
+            return
+        try:
+            self._token_manager.ensure_fresh(self._api_client.refresh_oauth2_token)
+        except HTTPStatusException as http_error:
+            raise XeroException(
+                "Failed to refresh the access token, please reauthorize the component") from http_error
+
+    @staticmethod
+    def _get_retry_after(rate_limit_exc: RateLimitException) -> float:
+        try:
+            return float(rate_limit_exc.headers.get("Retry-After", MINUTE))
+        except (AttributeError, TypeError, ValueError):
+            return MINUTE
@@ -0,0 +1,87 @@
+import hashlib
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Dict, Tuple
+
+from xero_python.api_client.serializer import serialize
+from xero_python.models import BaseModel
+
+from .utility import XeroException
+
+KEY_ALGORITHM_BLAKE2B = "blake2b"
+# MD5 of the JSON serialized object, the legacy key scheme of the original parser
+KEY_ALGORITHM_MD5 = "md5"
+KEY_ALGORITHMS = [KEY_ALGORITHM_BLAKE2B, KEY_ALGORITHM_MD5]
+
+DIGEST_SIZE = 16
+
+
+class SurrogateKeyEngine:
+    """
+    Generates surrogate keys of Xero objects that lack a native `<Model>ID`.
+
+    The blake2b algorithm hashes a canonical, type-tagged and length-prefixed stream of the model attributes
+    directly, without building JSON strings. Digests of nested models are memoized until `clear` is called,
+    so a child object is hashed once even though it is part of its parent's key as well as having its own.
+    Keys only depend on attribute values, so they are stable across runs.
+    """
+
+    def __init__(self, algorithm: str = KEY_ALGORITHM_BLAKE2B) -> None:
+        if algorithm not in KEY_ALGORITHMS:
+            raise XeroException(f"Unsupported surrogate key algorithm: {algorithm}")
+        self.algorithm = algorithm
+        self._digest_cache: Dict[int, Tuple[BaseModel, bytes]] = {}
+
+    def get_key(self, xero_object: BaseModel) -> str:
+        if self.algorithm == KEY_ALGORITHM_MD5:
+            return hashlib.md5(json.dumps(serialize(xero_object), sort_keys=True).encode('utf-8')).hexdigest()
+        return self._get_model_digest(xero_object).hex()
+
+    def clear(self) -> None:
+        self._digest_cache = {}
+
+    def _get_model_digest(self, model: BaseModel) -> bytes:
+        # the model reference is kept in the cache, so the id cannot be reused by another object
+        cached = self._digest_cache.get(id(model))
+        if cached:
+            return cached[1]
+
+        hasher = hashlib.blake2b(digest_size=DIGEST_SIZE)
+        self._update(hasher, b'm', model.__class__.__name__.encode('utf-8'))
+        for attribute_name in model.openapi_types:
+            value = getattr(model, attribute_name)
+            if value is not None:
+                self._update(hasher, b'a', attribute_name.encode('utf-8'))
+                self._update_value(hasher, value)
+
+        digest = hasher.digest()
+        self._digest_cache[id(model)] = (model, digest)
+        return digest
+
+    def _update_value(self, hasher, value: Any) -> None:
+        if isinstance(value, str):
+            self._update(hasher, b's', value.encode('utf-8'))
+        elif isinstance(value, bool):
+            self._update(hasher, b'b', b'1' if value else b'0')
+        elif isinstance(value, (int, float, Decimal)):
+            self._update(hasher, b'n', str(value).encode('utf-8'))
+        elif isinstance(value, (datetime, date)):
+            self._update(hasher, b't', value.isoformat().encode('utf-8'))
+        elif isinstance(value, Enum):
+            self._update(hasher, b'e', str(value.value).encode('utf-8'))
+        elif isinstance(value, BaseModel):
+            self._update(hasher, b'o', self._get_model_digest(value))
+        elif isinstance(value, (list, tuple)):
+            self._update(hasher, b'l', str(len(value)).encode('utf-8'))
+            for element in value:
+                self._update_value(hasher, element)
+        else:
+            self._update(hasher, b'r', repr(value).encode('utf-8'))
+
+    @staticmethod
+    def _update(hasher, tag: bytes, payload: bytes) -> None:
+        hasher.update(tag)
+        hasher.update(len(payload).to_bytes(4, 'big'))
+        hasher.update(payload)
@@ -0,0 +1,175 @@
+import logging
+import multiprocessing
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, List, Tuple
+
+from .xero_parser import XeroParser
+from .utility import EnhancedBaseModel
+
+_END_OF_STREAM = object()
+QUEUE_POLL_INTERVAL = 0.5
+
+
+class PipelineStopped(Exception):
+    pass
+
+
+def create_parse_pool(processes: int) -> ProcessPoolExecutor:
+    """Create a process pool for ExtractionPipeline parsing, it can be shared by all pipelines of a run."""
+    # workers are spawned, forking the process while the fetching threads hold locks could deadlock them
+    return ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn"))
+
+
+def _parse_page(parser: XeroParser, page: List[EnhancedBaseModel]) -> Dict[str, Tuple[List[str], List[tuple]]]:
+    """
+    Parse a page into per-table column names and row tuples, which are small to transfer from a worker process
+    and are written without building a dict per row.
+    """
+    compact_data = {}
+    for table_name, rows in parser.parse_data(page).items():
+        columns = list(dict.fromkeys(column for row in rows for column in row))
+        compact_data[table_name] = (columns, [tuple(row.get(column) for column in columns) for row in rows])
+    return compact_data
+
+
+class ExtractionPipeline:
+    """
+    Extracts a paginated accounting endpoint in three stages connected by bounded queues:
+
+    - fetch: pages are requested ahead while earlier pages are parsed, the number of pages in flight starts at one
+      and doubles with every full page up to `fetch_workers`, so small endpoints do not waste calls on empty pages
+    - parse: fetched pages are turned into per-table rows by XeroParser, either in a stage thread or, if `parse_pool`
+      is given, in worker processes with up to `parse_window` pages in flight, results are kept in page order
+    - write: column names and row tuples of each table are handed to `write_rows` in the calling thread,
+      in page order
+
+    The queues hold at most `queue_size` pages, so memory stays bounded regardless of the endpoint size.
+    An error in any stage stops the whole pipeline and is re-raised from `run`.
+    """
+
+    def __init__(self, fetch_page: Callable[[int], List[EnhancedBaseModel]],
+                 write_rows: Callable[[str, List[str], List[tuple]], None], page_size: int,
+                 fetch_workers: int = 1, queue_size: int = 4, parser: XeroParser = None,
+                 parse_pool: Executor = None, parse_window: int = 1) -> None:
+        self.fetch_page = fetch_page
+        self.write_rows = write_rows
+        self.parser = parser or XeroParser()
+        self.page_size = page_size
+        self.fetch_workers = max(1, fetch_workers)
+        self.parse_pool = parse_pool
+        self.parse_window = max(1, parse_window)
+
+        self._page_queue = queue.Queue(maxsize=queue_size)
+        self._rows_queue = queue.Queue(maxsize=queue_size)
+        self._stopped = threading.Event()
+        self._errors: List[BaseException] = []
+        self._object_count = 0
+
+    def run(self) -> int:
+        """Run the pipeline, return the number of extracted objects."""
+        stages = [threading.Thread(target=self._run_stage, args=(self._fetch_stage, self._page_queue), daemon=True),
+                  threading.Thread(target=self._run_stage, args=(self._parse_stage, self._rows_queue), daemon=True)]
+        for stage in stages:
+            stage.start()
+
+        try:
+            self._write_stage()
+        except PipelineStopped:
+            pass
+        except BaseException as e:
+            self._errors.append(e)
+            self._stopped.set()
+        finally:
+            for stage in stages:
+                stage.join()
+
+        if self._errors:
+            raise self._errors[0]
+        return self._object_count
+
+    def _run_stage(self, stage: Callable[[], None], output_queue: queue.Queue) -> None:
+        try:
+            stage()
+        except PipelineStopped:
+            return
+        except BaseException as e:
+            self._errors.append(e)
+            self._stopped.set()
+        self._put(output_queue, _END_OF_STREAM, force=True)
+
+    def _fetch_stage(self) -> None:
+        next_page = 1
+        window = 1
+        in_flight = deque()
+        with ThreadPoolExecutor(max_workers=self.fetch_workers) as executor:
+            while True:
+                while len(in_flight) < window:
+                    in_flight.append(executor.submit(self.fetch_page, next_page))
+                    next_page += 1
+
+                page = in_flight.popleft().result()
+                if page:
+                    self._object_count += len(page)
+                    self._put(self._page_queue, page)
+
+                if len(page) < self.page_size or self._stopped.is_set():
+                    for future in in_flight:
+                        future.cancel()
+                    break
+                window = min(window * 2, self.fetch_workers)
+
+        logging.debug(f"Fetched {next_page - len(in_flight) - 1} pages, {self._object_count} objects")
+
+    def _parse_stage(self) -> None:
+        if self.parse_pool:
+            self._parse_in_pool()
+            return
+        for page in self._iter_queue(self._page_queue):
+            self._put(self._rows_queue, _parse_page(self.parser, page))
+
+    def _parse_in_pool(self) -> None:
+        in_flight = deque()
+        try:
+            for page in self._iter_queue(self._page_queue):
+                in_flight.append(self.parse_pool.submit(_parse_page, self.parser, page))
+                if len(in_flight) >= self.parse_window:
+                    self._put(self._rows_queue, in_flight.popleft().result())
+            while in_flight:
+                self._put(self._rows_queue, in_flight.popleft().result())
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+    def _write_stage(self) -> None:
+        for parsed_data in self._iter_queue(self._rows_queue):
+            for table_name, (columns, rows) in parsed_data.items():
+                self.write_rows(table_name, columns, rows)
+
+    def _iter_queue(self, input_queue: queue.Queue):
+        while True:
+            item = self._get(input_queue)
+            if item is _END_OF_STREAM:
+                return
+            yield item
+
+    def _put(self, output_queue: queue.Queue, item, force: bool = False) -> None:
+        while True:
+            if self._stopped.is_set() and not force:
+                raise PipelineStopped()
+            try:
+                output_queue.put(item, timeout=QUEUE_POLL_INTERVAL)
+                return
+            except queue.Full:
+                if force and self._stopped.is_set():
+                    return
+
+    def _get(self, input_queue: queue.Queue):
+        while True:
+            try:
+                return input_queue.get(timeout=QUEUE_POLL_INTERVAL)
+            except queue.Empty:
+                if self._stopped.is_set():
+                    raise PipelineStopped()
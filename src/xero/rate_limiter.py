@@ -0,0 +1,77 @@
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict
+
+# Xero API limits per tenant (https://developer.xero.com/documentation/guides/oauth2/limits/)
+CONCURRENT_CALLS_LIMIT = 5
+MINUTE_CALLS_LIMIT = 60
+DAILY_CALLS_LIMIT = 5000
+
+MINUTE = 60
+
+# rough duration of a single report call, used for planning only
+ESTIMATED_CALL_DURATION = 2.0
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter keeping calls of each tenant within the Xero concurrent and per-minute limits.
+    """
+
+    def __init__(self, concurrent_limit: int = CONCURRENT_CALLS_LIMIT, minute_limit: int = MINUTE_CALLS_LIMIT):
+        self.concurrent_limit = concurrent_limit
+        self.minute_limit = minute_limit
+
+        self._lock = threading.Lock()
+        self._semaphores: Dict[str, threading.Semaphore] = {}
+        self._call_times: Dict[str, Deque[float]] = {}
+        self._blocked_until: Dict[str, float] = {}
+
+    @contextmanager
+    def limit(self, tenant_id: str):
+        with self._get_semaphore(tenant_id):
+            self._wait_for_slot(tenant_id)
+            yield
+
+    def block(self, tenant_id: str, seconds: float) -> None:
+        """Pause all calls of the tenant, e.g. after the API responded with 429 Too Many Requests."""
+        with self._lock:
+            self._blocked_until[tenant_id] = max(self._blocked_until.get(tenant_id, 0), time.monotonic() + seconds)
+
+    def _get_semaphore(self, tenant_id: str) -> threading.Semaphore:
+        with self._lock:
+            if tenant_id not in self._semaphores:
+                self._semaphores[tenant_id] = threading.Semaphore(self.concurrent_limit)
+                self._call_times[tenant_id] = deque()
+            return self._semaphores[tenant_id]
+
+    def _wait_for_slot(self, tenant_id: str) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                call_times = self._call_times[tenant_id]
+                while call_times and now - call_times[0] >= MINUTE:
+                    call_times.popleft()
+
+                wait_time = self._blocked_until.get(tenant_id, 0) - now
+                if wait_time <= 0 and len(call_times) < self.minute_limit:
+                    call_times.append(now)
+                    return
+                if len(call_times) >= self.minute_limit:
+                    wait_time = max(wait_time, MINUTE - (now - call_times[0]))
+            time.sleep(wait_time)
+
+
+def estimate_duration(calls: int, concurrency: int, call_duration: float = ESTIMATED_CALL_DURATION) -> float:
+    """
+    Estimate the wall time in seconds of making the calls for a single tenant under the rate limits.
+    """
+    if calls <= 0:
+        return 0.0
+    concurrency = max(1, min(concurrency, CONCURRENT_CALLS_LIMIT))
+    concurrency_bound = math.ceil(calls / concurrency) * call_duration
+    minute_bound = (math.ceil(calls / MINUTE_CALLS_LIMIT) - 1) * MINUTE + call_duration
+    return max(concurrency_bound, minute_bound)
@@ -0,0 +1,125 @@
+import gzip
+import hashlib
+import json
+from typing import Dict, Iterator, List, NamedTuple, Set, Tuple, Union
+
+import xero_python.accounting.models
+from xero_python.api_client import ModelFinder
+from xero_python.api_client.deserializer import deserialize
+from xero_python.api_client.serializer import serialize
+
+from .tracking import TrackingSelection
+from .utility import EnhancedBaseModel
+
+ARCHIVE_FILE_TAG = "xero_report_responses"
+ARCHIVE_FILE_SUFFIX = ".jsonl.gz"
+REPORT_RESPONSE_TYPE = "list[ReportWithRow]"
+
+KEY_REQUEST_KEY = "request_key"
+KEY_TENANT_ID = "tenant_id"
+KEY_PARAMETERS = "parameters"
+KEY_TRACKING_SELECTION = "tracking_selection"
+KEY_RESPONSE = "response"
+
+
+class ArchivedResponse(NamedTuple):
+    tenant_id: str
+    parameters: Dict
+    tracking_selection: Union[TrackingSelection, None]
+    response: List[EnhancedBaseModel]
+
+
+def get_request_key(tenant_id: str, parameters: Dict) -> str:
+    """Return the content address of a report request, the SHA-256 hash of the tenant ID and request parameters."""
+    request = json.dumps([tenant_id, parameters], sort_keys=True, default=str)
+    return hashlib.sha256(request.encode('utf-8')).hexdigest()
+
+
+class ResponseArchiveWriter:
+    """
+    Writes raw report responses to a gzip compressed JSON lines file, one response per line.
+
+    Every line holds the request parameters and the response serialized the same way as the API sends it,
+    so the response can be parsed again later without calling the API.
+    """
+
+    def __init__(self, file_path: str) -> None:
+        self._file = gzip.open(file_path, 'wt', encoding='utf-8')
+
+    def write(self, tenant_id: str, parameters: Dict, tracking_selection: Union[TrackingSelection, None],
+              response: List[EnhancedBaseModel]) -> None:
+        entry = {KEY_REQUEST_KEY: get_request_key(tenant_id, parameters),
+                 KEY_TENANT_ID: tenant_id,
+                 KEY_PARAMETERS: parameters,
+                 KEY_TRACKING_SELECTION: list(tracking_selection) if tracking_selection else None,
+                 KEY_RESPONSE: serialize(response)}
+        self._file.write(json.dumps(entry, default=str) + "\n")
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class ResponseArchiveReader:
+    """
+    Reads archived responses from archive files ordered from the oldest.
+
+    The files are indexed first, keeping only the position of the latest response of each request, so a response
+    archived again in a later file replaces the earlier one. Responses are then read and deserialized lazily,
+    one tenant at a time, so memory does not grow with the size of the archive.
+    """
+
+    def __init__(self, file_paths: List[str]) -> None:
+        self._file_paths = file_paths
+        # request key -> (file index, line number, tenant ID, has tracking selection)
+        self._index: Dict[str, Tuple[int, int, str, bool]] = {}
+        self._build_index()
+
+    def _build_index(self) -> None:
+        for file_index, file_path in enumerate(self._file_paths):
+            with gzip.open(file_path, 'rt', encoding='utf-8') as archive_file:
+                for line_number, line in enumerate(archive_file):
+                    entry = json.loads(line)
+                    self._index[entry[KEY_REQUEST_KEY]] = (file_index, line_number, entry[KEY_TENANT_ID],
+                                                           bool(entry[KEY_TRACKING_SELECTION]))
+
+    @property
+    def tenant_ids(self) -> List[str]:
+        return list(dict.fromkeys(tenant_id for _, _, tenant_id, _ in self._index.values()))
+
+    def get_response_count(self, tenant_id: str) -> int:
+        return sum(1 for _, _, entry_tenant_id, _ in self._index.values() if entry_tenant_id == tenant_id)
+
+    def has_tracking(self, tenant_id: str) -> bool:
+        return any(has_tracking for _, _, entry_tenant_id, has_tracking in self._index.values()
+                   if entry_tenant_id == tenant_id)
+
+    def iter_responses(self, tenant_id: str) -> Iterator[ArchivedResponse]:
+        """Yield the latest responses of the tenant's requests in archive order."""
+        lines_by_file: Dict[int, Set[int]] = {}
+        for file_index, line_number, entry_tenant_id, _ in self._index.values():
+            if entry_tenant_id == tenant_id:
+                lines_by_file.setdefault(file_index, set()).add(line_number)
+
+        model_finder = ModelFinder(xero_python.accounting.models)
+        for file_index in sorted(lines_by_file):
+            line_numbers = lines_by_file[file_index]
+            with gzip.open(self._file_paths[file_index], 'rt', encoding='utf-8') as archive_file:
+                for line_number, line in enumerate(archive_file):
+                    if line_number in line_numbers:
+                        yield self._to_archived_response(json.loads(line), model_finder)
+
+    @staticmethod
+    def _to_archived_response(entry: Dict, model_finder: ModelFinder) -> ArchivedResponse:
+        tracking_selection = entry[KEY_TRACKING_SELECTION]
+        if tracking_selection:
+            tracking_selection = TrackingSelection(*tracking_selection)
+        return ArchivedResponse(tenant_id=entry[KEY_TENANT_ID],
+                                parameters=entry[KEY_PARAMETERS],
+                                tracking_selection=tracking_selection,
+                                response=deserialize(REPORT_RESPONSE_TYPE, entry[KEY_RESPONSE], model_finder))
@@ -5,6 +5,9 @@ from keboola.component.dao import TableDefinition
 from .utility import (KeboolaTypeSpec, XeroException, get_accounting_model, get_element_type_name,
                       TERMINAL_TYPE_MAPPING, resolve_attribute_type, EnhancedBaseModel)
 
+# tables of all tenants are shared, every row carries the ID of the tenant it was downloaded from
+TENANT_ID_COLUMN = "tenant_id"
+
 
 class TableDefinitionFactory:
     def __init__(self, input_model_name: str, component: ComponentBase) -> None:
@@ -24,12 +27,15 @@ class TableDefinitionFactory:
                          table_name_prefix: str = None,
                          parent_id_field_name: str = None) -> None:
         table_name: str = model.__name__
-        field_types: Dict[str, KeboolaTypeSpec] = {}
+        field_types: Dict[str, KeboolaTypeSpec] = {TENANT_ID_COLUMN: TERMINAL_TYPE_MAPPING['str']}
         id_field_name = model.get_id_field_name()
+        primary_key = set()
         if not id_field_name:
             id_field_name = f'{table_name}ID'
             field_types[id_field_name] = TERMINAL_TYPE_MAPPING['str']
-        primary_key = {id_field_name}
+            # surrogate keys are hashed from the content, equal objects of different tenants share the key
+            primary_key.add(TENANT_ID_COLUMN)
+        primary_key.add(id_field_name)
         if parent_id_field_name:
             table_name = f'{table_name_prefix}_{table_name}'
             field_types[parent_id_field_name] = TERMINAL_TYPE_MAPPING['str']
@@ -39,7 +45,7 @@ class TableDefinitionFactory:
                 type_name=type_name, field_name=model.get_field_name(
                     attr_name),
                 table_name_prefix=table_name, parent_id_field_name=id_field_name)
-        if len(field_types) > 0:
+        if len(field_types) > 1:
             self._table_defs[table_name] = self.component.create_out_table_definition(name=f'{table_name}.csv',
                                                                                       primary_key=list(primary_key),
                                                                                       columns=list(field_types.keys()))
@@ -0,0 +1,55 @@
+import logging
+import threading
+import time
+from typing import Callable, Dict
+
+# refresh the access token this many seconds before it expires
+REFRESH_MARGIN = 300
+
+
+class OAuthTokenManager:
+    """
+    Thread-safe holder of the OAuth token shared by all requests of a client.
+
+    Refreshes are single-flight: concurrent callers wait for the refresh in progress instead of starting
+    their own with an already rotated refresh token. The access token is refreshed proactively,
+    `refresh_margin` seconds before it expires, and every rotated token is handed to `on_token_rotated`
+    immediately, so it can be persisted before it is needed again.
+    """
+
+    def __init__(self, token: Dict, on_token_rotated: Callable[[Dict], None] = None,
+                 refresh_margin: float = REFRESH_MARGIN) -> None:
+        self._token = token
+        self._on_token_rotated = on_token_rotated
+        self.refresh_margin = refresh_margin
+
+        self._token_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    def get_token(self) -> Dict:
+        with self._token_lock:
+            return self._token
+
+    def save_token(self, token: Dict) -> None:
+        with self._token_lock:
+            self._token = token
+        if self._on_token_rotated:
+            self._on_token_rotated(token)
+
+    def expires_soon(self) -> bool:
+        expires_at = self.get_token().get("expires_at")
+        return expires_at is not None and float(expires_at) - self.refresh_margin <= time.time()
+
+    def ensure_fresh(self, refresh: Callable[[], None]) -> None:
+        """Refresh the token using `refresh` if it expires soon, at most once for concurrent callers."""
+        if not self.expires_soon():
+            return
+        with self._refresh_lock:
+            # another thread may have refreshed the token while this one was waiting for the lock
+            if self.expires_soon():
+                logging.info("Access token expires soon, refreshing")
+                refresh()
+
+    def force_refresh(self, refresh: Callable[[], None]) -> None:
+        with self._refresh_lock:
+            refresh()
@@ -0,0 +1,74 @@
+from typing import Dict, List, NamedTuple, Tuple
+
+from .utility import XeroException, EnhancedBaseModel
+
+TRACKING_MODE_NONE = "none"
+TRACKING_MODE_ALL_OPTIONS = "all_options"
+TRACKING_MODE_SELECTED_PAIRS = "selected_pairs"
+TRACKING_MODES = [TRACKING_MODE_NONE, TRACKING_MODE_ALL_OPTIONS, TRACKING_MODE_SELECTED_PAIRS]
+
+TRACKING_STATUS_ACTIVE = "ACTIVE"
+
+
+class TrackingSelection(NamedTuple):
+    tracking_category_name1: str = ""
+    tracking_option_id1: str = ""
+    tracking_option_name1: str = ""
+    tracking_category_name2: str = ""
+    tracking_option_id2: str = ""
+    tracking_option_name2: str = ""
+
+
+TRACKING_COLUMNS = list(TrackingSelection._fields)
+
+
+def get_tracking_selections(tracking_categories: List[EnhancedBaseModel], mode: str,
+                            option_pairs: List[Tuple[str, str]] = None) -> List[TrackingSelection]:
+    """
+    Resolve tracking option combinations the balance sheet should be fetched for.
+
+    Args:
+        tracking_categories: TrackingCategory objects of a tenant
+        mode: `all_options` for every active option of every category, `selected_pairs` for option_pairs
+        option_pairs: (tracking_option_id1, tracking_option_id2) pairs, the second ID may be empty
+
+    Returns: List[TrackingSelection]
+
+    """
+    options = _get_options_by_id(tracking_categories)
+
+    if mode == TRACKING_MODE_ALL_OPTIONS:
+        return [TrackingSelection(category_name, option_id, option_name)
+                for option_id, (category_name, option_name, status) in options.items()
+                if status == TRACKING_STATUS_ACTIVE]
+    elif mode == TRACKING_MODE_SELECTED_PAIRS:
+        selections = []
+        for option_id1, option_id2 in option_pairs or []:
+            unknown_options = {option_id1, option_id2} - set(options) - {""}
+            if unknown_options:
+                raise XeroException(f"Tracking options {', '.join(sorted(unknown_options))} do not exist.")
+            category_name1, option_name1, _ = options[option_id1]
+            category_name2, option_name2, _ = options.get(option_id2, ("", "", ""))
+            selections.append(TrackingSelection(category_name1, option_id1, option_name1,
+                                                category_name2, option_id2, option_name2))
+        return selections
+    else:
+        raise XeroException(f"Unsupported tracking mode: {mode}.")
+
+
+def parse_option_pairs(option_pairs: str) -> List[Tuple[str, str]]:
+    """Parse comma separated `option_id1[:option_id2]` values."""
+    pairs = []
+    for pair in option_pairs.split(","):
+        if pair.strip():
+            option_id1, _, option_id2 = pair.partition(":")
+            pairs.append((option_id1.strip(), option_id2.strip()))
+    return pairs
+
+
+def _get_options_by_id(tracking_categories: List[EnhancedBaseModel]) -> Dict[str, Tuple[str, str, str]]:
+    options = {}
+    for category in tracking_categories:
+        for option in category.options or []:
+            options[option.tracking_option_id] = (category.name, option.name, str(option.status or ""))
+    return options
@@ -1,20 +1,21 @@
 from typing import Any, Dict, List, Tuple
-import hashlib
-import json
 
 from xero_python.api_client.serializer import serialize
 
+from .key_engine import SurrogateKeyEngine
 from .utility import XeroException, TERMINAL_TYPE_MAPPING, resolve_attribute_type, \
     EnhancedBaseModel
 
 
 class XeroParser:
-    def __init__(self) -> None:
+    def __init__(self, key_engine: SurrogateKeyEngine = None) -> None:
         self.parsed_data = None
+        self.key_engine = key_engine or SurrogateKeyEngine()
 
     def parse_data(self, xero_object_data) -> Dict[str, List[Dict]]:
         self.parsed_data = {}
         self._parse_data(xero_object_data)
+        self.key_engine.clear()
         return self.parsed_data
 
     def _parse_data(self, accounting_object_list: List[EnhancedBaseModel]) -> None:
@@ -94,14 +95,6 @@ class XeroParser:
                         f'Unexpected type encountered in struct: {struct.openapi_types[struct_attr_name]}.')
         return flattened_struct
 
-    @staticmethod
-    def _generate_hash_id(data_to_hash: bytes) -> str:
-        return hashlib.md5(data_to_hash).hexdigest()
-
-    @staticmethod
-    def _dump_xero_object_data(accounting_object: EnhancedBaseModel) -> bytes:
-        return json.dumps(serialize(accounting_object), sort_keys=True).encode('utf-8')
-
     def _get_xero_object_id_name_and_value(self, xero_object_data: EnhancedBaseModel) -> Tuple[str, str]:
         table_name = xero_object_data.__class__.__name__
         id_field_value = xero_object_data.get_id_value()
@@ -109,7 +102,7 @@ class XeroParser:
             id_field_name = xero_object_data.get_id_field_name()
         else:
             id_field_name = f'{table_name}ID'
-            id_field_value = self._generate_hash_id(self._dump_xero_object_data(xero_object_data))
+            id_field_value = self.key_engine.get_key(xero_object_data)
 
         return id_field_name, id_field_value
 
@@ -0,0 +1,33 @@
+import json
+import os
+from typing import Dict
+
+from component import Component
+
+BASE_PARAMETERS = {"report_parameters": {"date": "2024-03-31", "timeframe": "MONTH",
+                                         "tracking_option_id1": "", "tracking_option_id2": ""},
+                   "sync_options": {},
+                   "destination": {},
+                   "tenant_ids": ""}
+
+
+def make_component(data_dir: str, parameters: Dict = None, state: Dict = None,
+                   authorization: Dict = None) -> Component:
+    """
+    Write config.json, and the incoming state if given, to the data directory and create a component reading them.
+    `parameters` are merged over BASE_PARAMETERS, which hold the mandatory parameters.
+    """
+    os.makedirs(os.path.join(data_dir, "in"), exist_ok=True)
+    os.makedirs(os.path.join(data_dir, "out", "tables"), exist_ok=True)
+
+    config = {"parameters": BASE_PARAMETERS | (parameters or {})}
+    if authorization:
+        config["authorization"] = authorization
+    with open(os.path.join(data_dir, "config.json"), "w") as config_file:
+        json.dump(config, config_file)
+
+    if state is not None:
+        with open(os.path.join(data_dir, "in", "state.json"), "w") as state_file:
+            json.dump(state, state_file)
+
+    return Component(data_path_override=data_dir)
@@ -0,0 +1,82 @@
+import json
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from xero_python.api_client import ApiClient
+
+from component import Component
+from xero.client import XeroClient
+from xero.rate_limiter import MINUTE, estimate_duration
+
+from .helpers import make_component
+
+
+class TestEstimateDuration(unittest.TestCase):
+
+    def test_no_calls(self):
+        self.assertEqual(estimate_duration(0, 5), 0.0)
+
+    def test_concurrency_bound(self):
+        self.assertEqual(estimate_duration(10, 5, call_duration=2.0), 4.0)
+        self.assertEqual(estimate_duration(10, 1, call_duration=2.0), 20.0)
+
+    def test_concurrency_is_capped_at_xero_limit(self):
+        self.assertEqual(estimate_duration(10, 50, call_duration=2.0), estimate_duration(10, 5, call_duration=2.0))
+
+    def test_minute_limit_bound(self):
+        self.assertEqual(estimate_duration(121, 5, call_duration=1.0), 2 * MINUTE + 1.0)
+
+
+class TestEstimateCallPlan(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.data_dir.cleanup()
+
+    def _create_component(self, tenant_ids: str, expires_at: float, tracking_fan_out: dict = None) -> Component:
+        token = {"access_token": "access", "refresh_token": "refresh", "token_type": "Bearer", "expires_in": 1800,
+                 "expires_at": expires_at, "scope": ["accounting.reports.read"]}
+        parameters = {"sync_options": {"previous_periods": 2},
+                      "destination": {"load_type": "full_load"},
+                      "tenant_ids": tenant_ids,
+                      "tracking_fan_out": tracking_fan_out or {"mode": "none"},
+                      "accounting_objects": ["Invoices"]}
+        authorization = {"oauth_api": {"credentials": {"appKey": "key", "#appSecret": "secret",
+                                                       "#data": json.dumps(token)}}}
+        return make_component(self.data_dir.name, parameters, authorization=authorization)
+
+    @mock.patch.object(ApiClient, "refresh_oauth2_token")
+    @mock.patch.object(XeroClient, "get_available_tenant_ids", return_value=["T1", "T2"])
+    def test_valid_token_is_not_refreshed(self, get_available_tenant_ids, refresh_oauth2_token):
+        component = self._create_component("", expires_at=time.time() + 1800)
+
+        result = component.estimate_call_plan()
+
+        refresh_oauth2_token.assert_not_called()
+        get_available_tenant_ids.assert_called_once()
+        # 3 monthly balance sheets and one page of invoices per tenant
+        self.assertIn("| T1 | 4 |", result.message)
+        self.assertIn("| T2 | 4 |", result.message)
+        self.assertIn("| **Total** | 8 |", result.message)
+
+    @mock.patch.object(ApiClient, "refresh_oauth2_token")
+    @mock.patch.object(XeroClient, "get_available_tenant_ids")
+    def test_expired_token_uses_configured_tenants(self, get_available_tenant_ids, refresh_oauth2_token):
+        component = self._create_component("T1", expires_at=time.time() - 60,
+                                           tracking_fan_out={"mode": "selected_pairs", "option_pairs": "a:b, c"})
+
+        result = component.estimate_call_plan()
+
+        refresh_oauth2_token.assert_not_called()
+        get_available_tenant_ids.assert_not_called()
+        # tracking discovery, 3 periods for each of the 2 option pairs and one page of invoices
+        self.assertIn("| T1 | 8 |", result.message)
+        self.assertIn("without connecting to Xero", result.message)
+
+
+if __name__ == "__main__":
+    unittest.main()
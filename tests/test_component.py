@@ -3,12 +3,19 @@ Created on 12. 11. 2018
 
 @author: esner
 '''
+import csv
+import json
+import os
+import tempfile
 import unittest
+
 import mock
-import os
 from freezegun import freeze_time
+from xero_python.accounting.models import Invoice, LineItem, LineItemTracking
+
+from component import Component, KEY_STATE_LAST_MODIFIED
 
-from component import Component
+from .helpers import make_component
 
 
 class TestComponent(unittest.TestCase):
@@ -23,6 +30,51 @@ class TestComponent(unittest.TestCase):
             comp.run()
 
 
+class TestAccountingObjectTables(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.TemporaryDirectory()
+        self.component = make_component(self.data_dir.name, {"destination": {"load_type": "incremental_load"},
+                                                             "accounting_objects": ["Invoices"]})
+        self.component._init_configuration()
+        self.component.incremental_load = True
+        self.component.new_state[KEY_STATE_LAST_MODIFIED] = {}
+        invoice = Invoice(invoice_id="inv-1", line_items=[
+            LineItem(line_item_id="li-1", tracking=[LineItemTracking(name="Region", option="North")])])
+        self.component.client = mock.Mock()
+        self.component.client.supports_if_modified_since.return_value = False
+        self.component.client.get_accounting_object_page.side_effect = \
+            lambda model_name, tenant_id, page: [invoice] if page == 1 else []
+
+    def tearDown(self):
+        self.data_dir.cleanup()
+
+    def _read_table(self, table_name: str):
+        tables_path = os.path.join(self.data_dir.name, "out", "tables")
+        with open(os.path.join(tables_path, f"{table_name}.csv.manifest")) as manifest_file:
+            manifest = json.load(manifest_file)
+        with open(os.path.join(tables_path, f"{table_name}.csv")) as table_file:
+            rows = [dict(zip(manifest["columns"], row)) for row in csv.reader(table_file)]
+        return manifest, rows
+
+    def test_rows_carry_tenant_id(self):
+        self.component.download_accounting_objects(["T1", "T2"])
+
+        manifest, rows = self._read_table("Invoice")
+        self.assertEqual([(row["tenant_id"], row["InvoiceID"]) for row in rows], [("T1", "inv-1"), ("T2", "inv-1")])
+        self.assertEqual(manifest["primary_key"], ["InvoiceID"])
+        self.assertEqual(manifest["column_metadata"]["tenant_id"][0]["value"], "STRING")
+
+    def test_tenant_id_is_part_of_surrogate_primary_key(self):
+        self.component.download_accounting_objects(["T1", "T2"])
+
+        manifest, rows = self._read_table("Invoice_LineItem_LineItemTracking")
+        self.assertEqual(sorted(manifest["primary_key"]), ["LineItemID", "LineItemTrackingID", "tenant_id"])
+        self.assertEqual([row["tenant_id"] for row in rows], ["T1", "T2"])
+        self.assertEqual(rows[0]["LineItemTrackingID"], rows[1]["LineItemTrackingID"])
+        self.assertIn("tenant_id", self.component.schema_registry.get_columns("Invoice_LineItem_LineItemTracking"))
+
+
 if __name__ == "__main__":
     # import sys;sys.argv = ['', 'Test.testName']
     unittest.main()
@@ -0,0 +1,30 @@
+import tempfile
+import unittest
+
+from keboola.component.exceptions import UserException
+
+from .helpers import make_component
+
+
+class TestSyncOptionsValidation(unittest.TestCase):
+
+    def _init_configuration(self, sync_options: dict) -> None:
+        with tempfile.TemporaryDirectory() as data_dir:
+            make_component(data_dir, {"sync_options": sync_options})._init_configuration()
+
+    def test_valid_max_workers(self):
+        self._init_configuration({"max_workers": 1})
+        self._init_configuration({"max_workers": 5})
+
+    def test_invalid_max_workers_fails(self):
+        for max_workers in (0, -1, 6):
+            with self.assertRaisesRegex(UserException, "concurrent requests"):
+                self._init_configuration({"max_workers": max_workers})
+
+    def test_negative_parse_processes_fail(self):
+        with self.assertRaisesRegex(UserException, "parsing processes"):
+            self._init_configuration({"parse_processes": -1})
+
+
+if __name__ == "__main__":
+    unittest.main()
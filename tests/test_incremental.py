@@ -0,0 +1,100 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from keboola.component.exceptions import UserException
+from xero_python.accounting.models import Invoice
+
+from component import KEY_STATE_LAST_MODIFIED
+from xero.utility import XeroException
+
+from .helpers import make_component
+
+
+class TestIncrementalSync(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.TemporaryDirectory()
+        self.component = make_component(self.data_dir.name, {"sync_options": {"max_workers": 3},
+                                                             "destination": {"load_type": "incremental_load"},
+                                                             "accounting_objects": ["Invoices"]})
+        self.component._init_configuration()
+        self.component.incremental_load = True
+        self.component.new_state[KEY_STATE_LAST_MODIFIED] = {}
+        self.component.client = mock.Mock()
+        self.component.client.supports_if_modified_since.return_value = True
+
+    def tearDown(self):
+        self.data_dir.cleanup()
+
+    def test_mark_is_sent_only_for_incremental_load_of_supported_endpoints(self):
+        self.component.new_state[KEY_STATE_LAST_MODIFIED] = {"T1": {"Invoices": "2024-01-01T10:00:00+00:00"}}
+        expected = datetime(2024, 1, 1, 10, tzinfo=timezone.utc)
+
+        self.assertEqual(self.component._get_if_modified_since("T1", "Invoices"), expected)
+        self.assertIsNone(self.component._get_if_modified_since("T2", "Invoices"))
+
+        self.component.client.supports_if_modified_since.return_value = False
+        self.assertIsNone(self.component._get_if_modified_since("T1", "Invoices"))
+
+        self.component.client.supports_if_modified_since.return_value = True
+        self.component.incremental_load = False
+        self.assertIsNone(self.component._get_if_modified_since("T1", "Invoices"))
+
+    def test_maximum_is_taken_across_concurrent_pages_in_utc(self):
+        pages = {
+            1: [Invoice(invoice_id="1", updated_date_utc=datetime(2024, 1, 1, 12))],
+            # 13:00 in UTC, the latest of all
+            2: [Invoice(invoice_id="2", updated_date_utc=datetime(2024, 1, 1, 15,
+                                                                  tzinfo=timezone(timedelta(hours=2))))],
+            3: [Invoice(invoice_id="3", updated_date_utc=datetime(2024, 1, 1, 12, 30, tzinfo=timezone.utc)),
+                Invoice(invoice_id="4")],
+        }
+        self.component.client.get_accounting_object_page.side_effect = lambda model, tenant, page, **kw: pages[page]
+
+        threads = [threading.Thread(target=self.component._fetch_accounting_object_page, args=("Invoices", "T1", page))
+                   for page in pages]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.component._pending_last_modified, datetime(2024, 1, 1, 13, tzinfo=timezone.utc))
+
+    def test_nothing_is_committed_when_pipeline_fails(self):
+        incoming_marks = {"T1": {"Invoices": "2024-01-01T00:00:00+00:00"}}
+        self.component.new_state[KEY_STATE_LAST_MODIFIED] = json.loads(json.dumps(incoming_marks))
+
+        def get_page(model, tenant, page, **kwargs):
+            if page == 2:
+                raise XeroException("Page failed")
+            return [Invoice(invoice_id=f"{page}-{i}", updated_date_utc=datetime(2024, 2, 1, tzinfo=timezone.utc))
+                    for i in range(100)]
+
+        self.component.client.get_accounting_object_page.side_effect = get_page
+        with self.assertRaises(UserException):
+            self.component.download_accounting_objects(["T1"])
+
+        self.assertEqual(self.component.new_state[KEY_STATE_LAST_MODIFIED], incoming_marks)
+
+    def test_marks_are_stored_per_tenant(self):
+        updated_dates = {"T1": datetime(2024, 1, 5, tzinfo=timezone.utc),
+                         "T2": datetime(2024, 2, 7, tzinfo=timezone.utc)}
+
+        def get_page(model, tenant, page, **kwargs):
+            return [Invoice(invoice_id=f"{tenant}-{page}", updated_date_utc=updated_dates[tenant])] if page == 1 else []
+
+        self.component.client.get_accounting_object_page.side_effect = get_page
+        self.component.download_accounting_objects(["T1", "T2"])
+
+        self.assertEqual(self.component.new_state[KEY_STATE_LAST_MODIFIED],
+                         {"T1": {"Invoices": "2024-01-05T00:00:00+00:00"},
+                          "T2": {"Invoices": "2024-02-07T00:00:00+00:00"}})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+import hashlib
+import json
+import unittest
+
+from xero_python.accounting.models import LineItem, LineItemTracking
+from xero_python.api_client.serializer import serialize
+
+from xero.key_engine import SurrogateKeyEngine
+from xero.utility import XeroException
+
+
+class TestSurrogateKeyEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.tracking = LineItemTracking(name="Region", option="North")
+        self.line_item = LineItem(description="Item", quantity=2.0, tracking=[self.tracking])
+
+    def test_md5_matches_legacy_key_scheme(self):
+        legacy_key = hashlib.md5(json.dumps(serialize(self.tracking), sort_keys=True).encode('utf-8')).hexdigest()
+        self.assertEqual(SurrogateKeyEngine("md5").get_key(self.tracking), legacy_key)
+
+    def test_blake2b_keys_are_stable_and_value_based(self):
+        key = SurrogateKeyEngine().get_key(self.line_item)
+        same_line_item = LineItem(description="Item", quantity=2.0,
+                                  tracking=[LineItemTracking(name="Region", option="North")])
+        other_line_item = LineItem(description="Item", quantity=2.0,
+                                   tracking=[LineItemTracking(name="Region", option="South")])
+
+        self.assertEqual(len(key), 32)
+        self.assertEqual(SurrogateKeyEngine().get_key(same_line_item), key)
+        self.assertNotEqual(SurrogateKeyEngine().get_key(other_line_item), key)
+
+    def test_unsupported_algorithm_fails(self):
+        with self.assertRaises(XeroException):
+            SurrogateKeyEngine("sha1")
+
+
+if __name__ == "__main__":
+    unittest.main()
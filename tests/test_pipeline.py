@@ -0,0 +1,55 @@
+import unittest
+
+from xero_python.accounting.models import Contact
+
+from xero.pipeline import ExtractionPipeline, create_parse_pool
+
+
+def _contacts_page(page, page_count=5, page_size=10):
+    if page > page_count:
+        return []
+    return [Contact(contact_id=f"{page}-{i}") for i in range(page_size)]
+
+
+def _as_dicts(columns, rows):
+    return [dict(zip(columns, row)) for row in rows]
+
+
+class TestExtractionPipeline(unittest.TestCase):
+
+    def test_rows_written_in_page_order(self):
+        written = []
+        pipeline = ExtractionPipeline(fetch_page=_contacts_page,
+                                      write_rows=lambda table, columns, rows: written.extend(_as_dicts(columns, rows)),
+                                      page_size=10, fetch_workers=3, queue_size=1)
+
+        self.assertEqual(pipeline.run(), 50)
+        self.assertEqual([row["ContactID"] for row in written],
+                         [f"{page}-{i}" for page in range(1, 6) for i in range(10)])
+
+    def test_process_pool_rows_written_in_page_order(self):
+        written = []
+        with create_parse_pool(2) as parse_pool:
+            pipeline = ExtractionPipeline(fetch_page=_contacts_page,
+                                          write_rows=lambda table, columns, rows: written.extend(
+                                              _as_dicts(columns, rows)),
+                                          page_size=10, fetch_workers=3, parse_pool=parse_pool, parse_window=4)
+            self.assertEqual(pipeline.run(), 50)
+
+        self.assertEqual([row["ContactID"] for row in written],
+                         [f"{page}-{i}" for page in range(1, 6) for i in range(10)])
+
+    def test_fetch_error_is_raised(self):
+        def fetch_page(page):
+            if page == 3:
+                raise RuntimeError("Fetch failed")
+            return _contacts_page(page)
+
+        pipeline = ExtractionPipeline(fetch_page=fetch_page, write_rows=lambda table, columns, rows: None,
+                                      page_size=10)
+        with self.assertRaises(RuntimeError):
+            pipeline.run()
+
+
+if __name__ == "__main__":
+    unittest.main()
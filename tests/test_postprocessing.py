@@ -0,0 +1,78 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from component import Component, BalanceSheetRow
+from postprocessing import PERIOD_DELTA_COLUMNS, add_period_deltas
+from schema_registry import SchemaRegistry
+
+from .helpers import make_component
+
+FIELDNAMES = ["title", "account_name", "account_id", "date", "value"]
+
+
+class TestPeriodDeltas(unittest.TestCase):
+
+    def test_change_computed_per_account_against_previous_date(self):
+        rows = [("Assets", "Bank", "acc-1", "2024-02-29", "150.00"),
+                ("Assets", "Bank", "acc-1", "2024-01-31", "100.00"),
+                ("Assets", "Cash", "acc-2", "2024-02-29", "10.00"),
+                ("Assets", "Cash", "acc-2", "2024-01-31", "0.00"),
+                ("Assets", "Total Assets", "", "2024-02-29", ""),
+                ("Assets", "Total Assets", "", "2024-01-31", "100.00")]
+
+        result = add_period_deltas(rows, FIELDNAMES)
+
+        self.assertEqual([row[5:] for row in result], [(150.0, 50.0, 50.0),
+                                                       (100.0, "", ""),
+                                                       (10.0, 10.0, ""),
+                                                       (0.0, "", ""),
+                                                       ("", "", ""),
+                                                       (100.0, "", "")])
+
+    def test_empty_rows(self):
+        self.assertEqual(add_period_deltas([], FIELDNAMES), [])
+
+
+class TestPeriodDeltaManifest(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.TemporaryDirectory()
+        self.component = make_component(self.data_dir.name, {"sync_options": {"compute_period_deltas": True}})
+        self.component._init_configuration()
+
+    def tearDown(self):
+        self.data_dir.cleanup()
+
+    def _write_table(self) -> dict:
+        rows = {"2024-02-29": [BalanceSheetRow("BS", "Assets", "Bank", "acc-1", "2024-02-29", "2024-02-29", "150")],
+                "2024-01-31": [BalanceSheetRow("BS", "Assets", "Bank", "acc-1", "2024-01-31", "2024-01-31", "100")]}
+        with mock.patch.object(Component, "parse_balance_sheet", side_effect=lambda report, date: rows[date]):
+            self.component.write_balance_sheet_table("T1", [({"date": date}, None, None) for date in rows],
+                                                     with_tracking=False)
+        manifest_path = os.path.join(self.data_dir.name, "out", "tables", "balance_sheet_T1.manifest")
+        with open(manifest_path) as manifest_file:
+            manifest = json.load(manifest_file)
+        return {column: {item["key"]: item["value"] for item in metadata}
+                for column, metadata in manifest["column_metadata"].items()}
+
+    def test_delta_columns_are_nullable_numeric(self):
+        column_metadata = self._write_table()
+        for column in PERIOD_DELTA_COLUMNS:
+            self.assertEqual(column_metadata[column]["KBC.datatype.basetype"], "NUMERIC")
+            self.assertEqual(column_metadata[column]["KBC.datatype.length"], "38,8")
+            self.assertTrue(column_metadata[column]["KBC.datatype.nullable"])
+
+    def test_delta_columns_stay_nullable_with_registered_schema(self):
+        self._write_table()
+        self.component.schema_registry = SchemaRegistry(self.component.schema_registry.to_dict())
+
+        column_metadata = self._write_table()
+        for column in PERIOD_DELTA_COLUMNS:
+            self.assertTrue(column_metadata[column]["KBC.datatype.nullable"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from xero_python.accounting.models import ReportAttribute, ReportCell, ReportRow, ReportRows, ReportWithRow, \
+    RowType
+from xero_python.api_client.deserializer import deserialize
+
+from xero.response_archive import ResponseArchiveReader, ResponseArchiveWriter, get_request_key
+from xero.tracking import TrackingSelection
+
+
+def build_report(value: str) -> list:
+    account_cells = [ReportCell(value="Cash"),
+                     ReportCell(value=value, attributes=[ReportAttribute(id="account", value="acc-1")])]
+    return [ReportWithRow(report_id="BalanceSheet", report_titles=["Balance Sheet", "Org"],
+                          report_date="31 March 2024",
+                          rows=[ReportRows(row_type=RowType.HEADER,
+                                           cells=[ReportCell(value=""), ReportCell(value="31 Mar 2024")]),
+                                ReportRows(row_type=RowType.SECTION, title="Assets",
+                                           rows=[ReportRow(row_type=RowType.ROW, cells=account_cells)])])]
+
+
+class TestResponseArchive(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.parameters = {"date": "2024-03-31", "timeframe": "MONTH"}
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _write_archive(self, file_name: str, responses: list) -> str:
+        file_path = os.path.join(self.temp_dir.name, file_name)
+        with ResponseArchiveWriter(file_path) as archive:
+            for tenant_id, parameters, tracking_selection, response in responses:
+                archive.write(tenant_id, parameters, tracking_selection, response)
+        return file_path
+
+    def test_responses_are_restored(self):
+        selection = TrackingSelection("Region", "opt-1", "North")
+        file_path = self._write_archive("archive.jsonl.gz",
+                                        [("T1", self.parameters, selection, build_report("100.00"))])
+
+        archive = ResponseArchiveReader([file_path])
+        archived = list(archive.iter_responses("T1"))
+
+        self.assertEqual(archive.tenant_ids, ["T1"])
+        self.assertTrue(archive.has_tracking("T1"))
+        self.assertEqual(len(archived), 1)
+        self.assertEqual(archived[0].parameters, self.parameters)
+        self.assertEqual(archived[0].tracking_selection, selection)
+        report = archived[0].response[0]
+        self.assertIsInstance(report, ReportWithRow)
+        self.assertEqual(report.rows[1].rows[0].cells[1].value, "100.00")
+        self.assertEqual(report.rows[1].rows[0].cells[1].attributes[0].value, "acc-1")
+
+    def test_later_archive_replaces_same_request(self):
+        other_parameters = self.parameters | {"date": "2024-02-29"}
+        older = self._write_archive("older.jsonl.gz", [("T1", self.parameters, None, build_report("100.00")),
+                                                       ("T1", other_parameters, None, build_report("50.00"))])
+        newer = self._write_archive("newer.jsonl.gz", [("T1", self.parameters, None, build_report("200.00"))])
+
+        archive = ResponseArchiveReader([older, newer])
+        archived = list(archive.iter_responses("T1"))
+
+        self.assertEqual(archive.get_response_count("T1"), 2)
+        self.assertEqual([response.parameters for response in archived], [other_parameters, self.parameters])
+        self.assertEqual([response.response[0].rows[1].rows[0].cells[1].value for response in archived],
+                         ["50.00", "200.00"])
+
+    @mock.patch("xero.response_archive.deserialize", wraps=deserialize)
+    def test_responses_are_deserialized_per_tenant(self, deserialize_mock):
+        file_path = self._write_archive("archive.jsonl.gz", [("T1", self.parameters, None, build_report("1.00")),
+                                                             ("T2", self.parameters, None, build_report("2.00"))])
+
+        archive = ResponseArchiveReader([file_path])
+        self.assertEqual(archive.tenant_ids, ["T1", "T2"])
+        deserialize_mock.assert_not_called()
+
+        responses = archive.iter_responses("T2")
+        self.assertEqual(next(responses).tenant_id, "T2")
+        self.assertEqual(deserialize_mock.call_count, 1)
+        self.assertEqual(list(responses), [])
+        self.assertEqual(archive.get_response_count("T3"), 0)
+
+    def test_request_key_ignores_parameter_order(self):
+        self.assertEqual(get_request_key("T1", {"a": 1, "b": 2}), get_request_key("T1", {"b": 2, "a": 1}))
+        self.assertNotEqual(get_request_key("T1", self.parameters), get_request_key("T2", self.parameters))
+
+
+if __name__ == "__main__":
+    unittest.main()
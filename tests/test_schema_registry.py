@@ -0,0 +1,59 @@
+import unittest
+
+from keboola.component.dao import TableDefinition, TableMetadata
+
+from schema_registry import SchemaRegistry
+
+
+class TestSchemaRegistry(unittest.TestCase):
+
+    def _table_def(self, name, column_types=None):
+        table_metadata = TableMetadata()
+        for column, data_type in (column_types or {}).items():
+            table_metadata.add_column_data_type(column, data_type)
+        return TableDefinition(name=name, full_path=f"/tmp/{name}", table_metadata=table_metadata)
+
+    def test_known_columns_seed_fieldnames(self):
+        registry = SchemaRegistry()
+        registry.register_table(self._table_def("Invoice.csv"), ["InvoiceID", "Total", "Extra"])
+
+        restored = SchemaRegistry(registry.to_dict())
+        self.assertEqual(restored.get_fieldnames("Invoice", ["Total", "Date"]), ["Total", "Date", "InvoiceID", "Extra"])
+
+    def test_column_types_recorded_and_added_to_table_definition(self):
+        registry = SchemaRegistry()
+        registry.register_table(self._table_def("Invoice.csv", {"Total": "NUMERIC"}), ["InvoiceID", "Total"])
+
+        table_def = self._table_def("Invoice.csv")
+        SchemaRegistry(registry.to_dict()).register_table(table_def, ["InvoiceID", "Total"])
+        self.assertEqual(table_def.table_metadata.column_metadata["Total"]["KBC.datatype.basetype"], "NUMERIC")
+        self.assertEqual(table_def.table_metadata.column_metadata["InvoiceID"]["KBC.datatype.basetype"], "STRING")
+
+    def test_nullability_recorded_and_kept(self):
+        table_def = self._table_def("Invoice.csv")
+        table_def.table_metadata.add_column_data_type("Total", "NUMERIC", nullable=True, length="38,8")
+        table_def.table_metadata.add_column_data_type("InvoiceID", "STRING", nullable=False)
+        registry = SchemaRegistry()
+        registry.register_table(table_def, ["InvoiceID", "Total", "Extra"])
+
+        column_metadata = table_def.table_metadata.column_metadata
+        self.assertTrue(column_metadata["Total"]["KBC.datatype.nullable"])
+        self.assertFalse(column_metadata["InvoiceID"]["KBC.datatype.nullable"])
+        self.assertTrue(column_metadata["Extra"]["KBC.datatype.nullable"])
+
+        restored_def = self._table_def("Invoice.csv")
+        SchemaRegistry(registry.to_dict()).register_table(restored_def, ["InvoiceID", "Total", "Extra"])
+        restored_metadata = restored_def.table_metadata.column_metadata
+        self.assertTrue(restored_metadata["Total"]["KBC.datatype.nullable"])
+        self.assertFalse(restored_metadata["InvoiceID"]["KBC.datatype.nullable"])
+
+    def test_types_without_nullability_are_nullable(self):
+        registry = SchemaRegistry({"Invoice": {"columns": ["Total"],
+                                               "types": {"Total": {"type": "NUMERIC", "length": "38,8"}}}})
+        table_def = self._table_def("Invoice.csv")
+        registry.register_table(table_def, ["Total"])
+        self.assertTrue(table_def.table_metadata.column_metadata["Total"]["KBC.datatype.nullable"])
+
+
+if __name__ == "__main__":
+    unittest.main()
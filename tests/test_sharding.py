@@ -0,0 +1,29 @@
+import unittest
+
+from sharding import get_shard, get_shard_tenant_ids
+
+
+class TestSharding(unittest.TestCase):
+
+    def setUp(self):
+        self.tenant_ids = [f"tenant-{i}" for i in range(50)]
+
+    def test_shards_partition_tenants(self):
+        shards = [get_shard_tenant_ids(self.tenant_ids, shard_index, 4) for shard_index in range(4)]
+
+        self.assertEqual(sorted(sum(shards, [])), sorted(self.tenant_ids))
+        self.assertTrue(all(shards))
+
+    def test_shard_does_not_depend_on_tenant_list(self):
+        shard = get_shard_tenant_ids(self.tenant_ids, 1, 3)
+        reversed_shard = get_shard_tenant_ids(list(reversed(self.tenant_ids)) + ["other-tenant"], 1, 3)
+
+        self.assertEqual(set(shard), set(reversed_shard) - {"other-tenant"})
+        self.assertEqual(get_shard("tenant-0", 3), get_shard("tenant-0", 3))
+
+    def test_single_shard_keeps_all_tenants(self):
+        self.assertEqual(get_shard_tenant_ids(self.tenant_ids, 0, 1), self.tenant_ids)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from component import KEY_STATE_LAST_MODIFIED, KEY_STATE_OAUTH_TOKEN_DICT
+from xero.token_manager import OAuthTokenManager
+
+from .helpers import make_component
+
+
+class TestOAuthTokenManager(unittest.TestCase):
+
+    def test_refresh_is_single_flight(self):
+        rotated_tokens = []
+        manager = OAuthTokenManager({"refresh_token": "r0", "expires_at": time.time() + 10},
+                                    on_token_rotated=rotated_tokens.append)
+        refresh_count = []
+
+        def refresh():
+            refresh_count.append(1)
+            time.sleep(0.05)
+            manager.save_token({"refresh_token": f"r{len(refresh_count)}", "expires_at": time.time() + 1800})
+
+        threads = [threading.Thread(target=manager.ensure_fresh, args=(refresh,)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(refresh_count), 1)
+        self.assertEqual(manager.get_token()["refresh_token"], "r1")
+        self.assertEqual([token["refresh_token"] for token in rotated_tokens], ["r1"])
+
+    def test_valid_token_is_not_refreshed(self):
+        manager = OAuthTokenManager({"refresh_token": "r0", "expires_at": time.time() + 1800})
+        manager.ensure_fresh(lambda: self.fail("Token should not be refreshed"))
+        self.assertFalse(manager.expires_soon())
+
+
+class TestTokenRotationState(unittest.TestCase):
+
+    def test_rotated_token_is_merged_into_incoming_state(self):
+        with tempfile.TemporaryDirectory() as data_dir:
+            incoming_marks = {"T1": {"Invoices": "2024-01-01T00:00:00+00:00"}}
+            component = make_component(data_dir, state={KEY_STATE_OAUTH_TOKEN_DICT: "{}",
+                                                        KEY_STATE_LAST_MODIFIED: incoming_marks})
+            component.new_state[KEY_STATE_LAST_MODIFIED] = {"T1": {"Invoices": "2024-06-01T00:00:00+00:00"}}
+            component._on_token_rotated({"refresh_token": "r1"})
+
+            with open(os.path.join(data_dir, "out", "state.json")) as state_file:
+                state = json.load(state_file)
+            self.assertEqual(json.loads(state[KEY_STATE_OAUTH_TOKEN_DICT]), {"refresh_token": "r1"})
+            self.assertEqual(state[KEY_STATE_LAST_MODIFIED], incoming_marks)
+
+
+if __name__ == "__main__":
+    unittest.main()
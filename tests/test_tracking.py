@@ -0,0 +1,62 @@
+import tempfile
+import unittest
+
+from keboola.component.exceptions import UserException
+from xero_python.accounting.models import TrackingCategory, TrackingOption
+
+from xero.tracking import TrackingSelection, get_tracking_selections, parse_option_pairs
+from xero.utility import XeroException
+
+from .helpers import make_component
+
+
+class TestTrackingSelections(unittest.TestCase):
+
+    def setUp(self):
+        self.tracking_categories = [
+            TrackingCategory(name="Region", options=[
+                TrackingOption(tracking_option_id="north", name="North", status="ACTIVE"),
+                TrackingOption(tracking_option_id="south", name="South", status="ARCHIVED")]),
+            TrackingCategory(name="Department", options=[
+                TrackingOption(tracking_option_id="sales", name="Sales", status="ACTIVE")])]
+
+    def test_all_options_returns_active_options(self):
+        selections = get_tracking_selections(self.tracking_categories, "all_options")
+        self.assertEqual(selections, [TrackingSelection("Region", "north", "North"),
+                                      TrackingSelection("Department", "sales", "Sales")])
+
+    def test_selected_pairs(self):
+        pairs = parse_option_pairs("north:sales, south")
+        self.assertEqual(pairs, [("north", "sales"), ("south", "")])
+        selections = get_tracking_selections(self.tracking_categories, "selected_pairs", pairs)
+        self.assertEqual(selections, [TrackingSelection("Region", "north", "North", "Department", "sales", "Sales"),
+                                      TrackingSelection("Region", "south", "South")])
+
+    def test_unknown_selected_option_fails(self):
+        with self.assertRaises(XeroException):
+            get_tracking_selections(self.tracking_categories, "selected_pairs", [("east", "")])
+
+
+class TestTrackingFanOutValidation(unittest.TestCase):
+
+    def _init_configuration(self, tracking_fan_out: dict) -> None:
+        with tempfile.TemporaryDirectory() as data_dir:
+            make_component(data_dir, {"tracking_fan_out": tracking_fan_out})._init_configuration()
+
+    def test_valid_modes(self):
+        self._init_configuration({"mode": "none"})
+        self._init_configuration({"mode": "all_options"})
+        self._init_configuration({"mode": "selected_pairs", "option_pairs": "a:b, c"})
+
+    def test_invalid_mode_fails(self):
+        with self.assertRaisesRegex(UserException, "Invalid tracking fan-out mode"):
+            self._init_configuration({"mode": "everything"})
+
+    def test_selected_pairs_require_option_pairs(self):
+        for option_pairs in ("", " , ", ":b"):
+            with self.assertRaisesRegex(UserException, "option pairs"):
+                self._init_configuration({"mode": "selected_pairs", "option_pairs": option_pairs})
+
+
+if __name__ == "__main__":
+    unittest.main()
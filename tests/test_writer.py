@@ -0,0 +1,65 @@
+import csv
+import os
+import tempfile
+import unittest
+
+from writer import FixedSchemaWriter
+
+
+class TestFixedSchemaWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.result_path = os.path.join(self.temp_dir.name, 'result.csv')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _read_result(self):
+        with open(self.result_path, newline='', encoding='utf-8') as result_file:
+            return list(csv.DictReader(result_file))
+
+    def test_fixed_rows_written_with_header(self):
+        with FixedSchemaWriter(self.result_path, ['a', 'b']) as wr:
+            wr.writerows([('1', '2'), ('3', '4')])
+            wr.write_dicts([{'b': '6'}])
+
+        self.assertFalse(wr.is_elastic)
+        self.assertEqual(self._read_result(), [{'a': '1', 'b': '2'}, {'a': '3', 'b': '4'}, {'a': '', 'b': '6'}])
+
+    def test_unknown_column_falls_back_to_elastic_writer(self):
+        with FixedSchemaWriter(self.result_path, ['a', 'b']) as wr:
+            wr.writerows([('1', '2')])
+            wr.write_dicts([{'a': '3', 'c': '5'}])
+            wr.writerows([('7', '8')])
+
+        self.assertTrue(wr.is_elastic)
+        self.assertEqual(set(wr.fieldnames), {'a', 'b', 'c'})
+        rows = sorted(self._read_result(), key=lambda r: r['a'])
+        self.assertEqual(rows, [{'a': '1', 'b': '2', 'c': ''},
+                                {'a': '3', 'b': '', 'c': '5'},
+                                {'a': '7', 'b': '8', 'c': ''}])
+
+    def test_column_rows_are_reordered_to_header(self):
+        with FixedSchemaWriter(self.result_path, ['a', 'b', 'c']) as wr:
+            wr.write_columns(['a', 'b', 'c'], [('1', '2', '3')])
+            wr.write_columns(['c', 'a'], [('6', '4'), (None, '7')])
+
+        self.assertFalse(wr.is_elastic)
+        self.assertEqual(self._read_result(), [{'a': '1', 'b': '2', 'c': '3'},
+                                               {'a': '4', 'b': '', 'c': '6'},
+                                               {'a': '7', 'b': '', 'c': ''}])
+
+    def test_column_rows_with_unknown_column_fall_back_to_headless_elastic_writer(self):
+        with FixedSchemaWriter(self.result_path, ['a', 'b'], write_header=False) as wr:
+            wr.write_columns(['b', 'a'], [('2', '1')])
+            wr.write_columns(['a', 'c'], [('3', '5')])
+
+        self.assertTrue(wr.is_elastic)
+        with open(self.result_path, newline='', encoding='utf-8') as result_file:
+            rows = sorted(csv.DictReader(result_file, fieldnames=wr.fieldnames), key=lambda r: r['a'])
+        self.assertEqual(rows, [{'a': '1', 'b': '2', 'c': ''}, {'a': '3', 'b': '', 'c': '5'}])
+
+
+if __name__ == "__main__":
+    unittest.main()